@@ -8,6 +8,23 @@ This module implements event-driven backtesting with:
 4. Performance attribution
 5. Walk-forward validation
 
+Strategies that can compute target positions for the whole history up
+front can use the vectorized mode (`run_vectorized`, see vectorized.py),
+which follows the same execution model with NumPy array operations.
+Event-driven strategies can opt into zero-copy history views with O(1)
+incremental indicators (see history.py). Pending orders are kept in a
+queue and executed orders in an append-only fill log (see fill_log.py),
+so per-bar cost does not grow with the number of orders placed.
+Multi-asset target-weight strategies (e.g. MSRR rebalances) run in
+portfolio mode (`run_portfolio`, see portfolio.py) on symbol-indexed
+NumPy vectors. Histories too large for memory can be streamed from the
+columnar market data store in chunks (`run_backtest_stream`, see
+market_data.py). Intraday strategies can be replayed tick by tick with
+order latency and market impact (`run_tick_replay`, see tick_replay.py).
+Return, risk and drawdown metrics are accumulated online bar by bar into
+a preallocated equity buffer (see online_metrics.py), so they can be read
+mid-run with `live_metrics` and long runs can bound the equity kept.
+
 References:
 - Prado, M. L. (2018). Advances in Financial Machine Learning
 - Bailey, D. H., et al. (2014). Pseudo-Mathematics and Financial Charlatanism
@@ -16,11 +33,18 @@ References:
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple, Callable
+from typing import Dict, Iterable, List, Optional, Tuple, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 import logging
+from collections import deque
+
+from backtesting.checkpoint import BacktestCheckpoint, WalkForwardCheckpoint, run_key
+from backtesting.fill_log import FillLog
+from backtesting.history import HistoryView
+from backtesting.online_metrics import EquityBuffer, OnlineMetrics
+from backtesting.walk_forward import run_windows, walk_forward_windows
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +62,7 @@ class OrderStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     """Trading order."""
     symbol: str
@@ -51,7 +75,7 @@ class Order:
     fill_timestamp: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """Trading position."""
     symbol: str
@@ -62,7 +86,7 @@ class Position:
     unrealized_pnl: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     """Completed trade."""
     symbol: str
@@ -103,6 +127,14 @@ class BacktestConfig:
     train_period_days: int = 252     # Training period (1 year)
     test_period_days: int = 63       # Test period (3 months)
     step_days: int = 21              # Step size (1 month)
+    walk_forward_workers: int = 1    # Processes running windows in parallel
+    
+    # Checkpointing (see checkpoint.py)
+    checkpoint_dir: Optional[str] = None  # Resume state directory (None = off)
+    checkpoint_every: int = 50000    # Bars between run_backtest checkpoints
+    
+    # Metrics (see online_metrics.py)
+    equity_buffer_size: Optional[int] = None  # Recent equity points kept (None = all)
 
 
 class BacktestEngine:
@@ -120,10 +152,11 @@ class BacktestEngine:
         # State
         self.capital = self.config.initial_capital
         self.positions: Dict[str, Position] = {}
-        self.orders: List[Order] = []
+        self.pending_orders: deque = deque()  # Orders awaiting execution (FIFO)
+        self.fills = FillLog()                 # Executed orders
         self.trades: List[Trade] = []
-        self.equity_curve: List[float] = [self.capital]
-        self.timestamps: List[datetime] = []
+        self.equity_curve = EquityBuffer(self.capital, capacity=self.config.equity_buffer_size)
+        self.metrics = OnlineMetrics(self.capital)  # Updated every bar
         
         # Performance tracking
         self.total_pnl = 0.0
@@ -139,6 +172,10 @@ class BacktestEngine:
         """
         Run backtest on historical data.
         
+        Strategies decorated with `history.history_view` receive a growing
+        HistoryView (zero-copy NumPy columns with incremental indicators)
+        instead of a `data.iloc[:i+1]` DataFrame copy per bar.
+        
         Args:
             data: DataFrame with OHLCV data
             strategy: Strategy function that returns signals
@@ -150,12 +187,114 @@ class BacktestEngine:
         self.logger.info("Starting backtest...")
         
         # Reset state
+        self._reset(len(data))
+        
+        # Resume from a checkpoint of the same run, if any
+        checkpoint = None
+        bars_done = 0
+        if self.config.checkpoint_dir is not None:
+            checkpoint = BacktestCheckpoint(
+                self.config.checkpoint_dir,
+                run_key(data, self.config, strategy, strategy_params),
+                self.config.checkpoint_every
+            )
+            bars_done = checkpoint.restore(self)
+        
+        history = self._run_bars(data, strategy, strategy_params, bars_done, bars_done, checkpoint)
+        
+        # Close all positions at end
+        final_bar = history.bar(len(data) - 1)
+        self._close_all_positions(final_bar, data.index[-1])
+        
+        # Calculate performance metrics
+        results = self._calculate_metrics()
+        
+        if checkpoint is not None:
+            checkpoint.remove()
+        
+        self.logger.info("Backtest complete")
+        
+        return results
+    
+    def run_backtest_stream(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        strategy: Callable,
+        lookback: int = 0,
+        **strategy_params
+    ) -> Dict:
+        """
+        Run a backtest over consecutive chunks of bars (see market_data.py).
+        
+        Only one chunk plus `lookback` bars of the previous one are held at
+        a time. Strategies see the current chunk's history extended by those
+        `lookback` bars, so results match run_backtest when strategies look
+        back at most `lookback` bars.
+        
+        Args:
+            chunks: DataFrames of consecutive bars, in time order
+            strategy: Strategy function that returns signals
+            lookback: Bars of history carried across chunk boundaries
+            **strategy_params: Parameters to pass to strategy
+        
+        Returns:
+            Dictionary with backtest results
+        """
+        from backtesting.market_data import with_lookback
+        
+        self.logger.info("Starting streaming backtest...")
         self._reset()
         
+        history = None
+        n_bars = 0
+        for data, n_warmup in with_lookback(chunks, lookback):
+            history = self._run_bars(data, strategy, strategy_params, n_warmup, n_bars)
+            n_bars += len(data) - n_warmup
+        
+        if history is None:
+            raise ValueError("No bars to backtest")
+        
+        self._close_all_positions(history.bar(len(history) - 1), history.timestamps[-1])
+        
+        results = self._calculate_metrics()
+        
+        self.logger.info("Streaming backtest complete")
+        
+        return results
+    
+    def _run_bars(
+        self,
+        data: pd.DataFrame,
+        strategy: Callable,
+        strategy_params: Dict,
+        n_warmup: int = 0,
+        bar_offset: int = 0,
+        checkpoint: Optional[BacktestCheckpoint] = None
+    ) -> HistoryView:
+        """
+        Step the engine through the bars of `data`.
+        
+        Args:
+            data: Bars, of which the first `n_warmup` are history only
+            strategy: Strategy function that returns signals
+            strategy_params: Parameters to pass to strategy
+            n_warmup: Leading bars already processed (strategy history only)
+            bar_offset: Bars processed before `data[n_warmup]`
+            checkpoint: Saves engine state every `checkpoint.every` bars
+        
+        Returns:
+            HistoryView over `data`
+        """
+        # Bars are read from NumPy columns instead of building a Series per row
+        history = HistoryView(data)
+        times = self.equity_curve.encode_times(history.timestamps)
+        uses_history_view = getattr(strategy, 'uses_history_view', False)
+        
         # Run through historical data
-        for i in range(len(data)):
-            timestamp = data.index[i]
-            bar = data.iloc[i]
+        for i in range(n_warmup, len(data)):
+            timestamp = history.timestamps[i]
+            bar = history.bar(i)
+            history.advance(i + 1)
             
             # Update positions with current prices
             self._update_positions(bar)
@@ -167,25 +306,191 @@ class BacktestEngine:
             self._check_risk_management(bar)
             
             # Get strategy signal
-            if i >= self.config.execution_delay:
-                signal = strategy(data.iloc[:i+1], **strategy_params)
+            if bar_offset + i - n_warmup >= self.config.execution_delay:
+                if uses_history_view:
+                    signal = strategy(history, **strategy_params)
+                else:
+                    signal = strategy(data.iloc[:i+1], **strategy_params)
                 
                 if signal is not None:
                     self._process_signal(signal, bar, timestamp)
             
             # Record equity
             equity = self._calculate_equity(bar)
-            self.equity_curve.append(equity)
-            self.timestamps.append(timestamp)
+            self.equity_curve.append(equity, times[i])
+            self.metrics.update(equity)
+            
+            bars_done = bar_offset + i - n_warmup + 1
+            if checkpoint is not None and checkpoint.due(bars_done):
+                checkpoint.save(self, bars_done)
         
-        # Close all positions at end
-        final_bar = data.iloc[-1]
-        self._close_all_positions(final_bar, data.index[-1])
+        return history
+    
+    def run_vectorized(
+        self,
+        data: pd.DataFrame,
+        targets: np.ndarray,
+        symbol: str
+    ) -> Dict:
+        """
+        Run a vectorized backtest on a target-position array.
+        
+        Uses the event-driven execution model (next-bar fills with slippage,
+        commissions, close-out at the final bar) without a per-bar loop.
+        max_position_size is not applied; sizing is up to the targets.
+        
+        Args:
+            data: DataFrame with a price column for `symbol`
+            targets: Desired position in units decided at each bar
+            symbol: Traded symbol (price column)
+        
+        Returns:
+            Dictionary with backtest results (same keys as run_backtest)
+        """
+        from backtesting.vectorized import POSITION_EPSILON, extract_trades, simulate_targets
+        
+        if self.config.stop_loss_pct is not None or self.config.take_profit_pct is not None:
+            raise ValueError("Stop loss / take profit require the event-driven engine (run_backtest)")
+        
+        self.logger.info("Starting vectorized backtest...")
+        self._reset(len(data))
+        
+        prices = data[symbol].to_numpy(dtype=np.float64)
+        result = simulate_targets(
+            prices,
+            targets,
+            initial_capital=self.config.initial_capital,
+            commission_rate=self.config.commission_rate,
+            slippage_bps=self.config.slippage_bps,
+            use_market_orders=self.config.use_market_orders,
+            execution_delay=self.config.execution_delay
+        )
+        
+        self._record_equity(result.equity, data.index)
+        self.capital = result.capital[-1] if len(prices) else self.capital
+        
+        self.total_commission = float(result.commission.sum())
+        self.total_slippage = float(result.slippage.sum())
+        
+        # Close all positions at end, filled at the final bar
+        final_position = result.position[-1] if len(prices) else 0.0
+        close_price = None
+        close_commission = 0.0
+        if final_position > POSITION_EPSILON:
+            slippage = self.config.slippage_bps / 10000 if self.config.use_market_orders else 0.0
+            close_price = prices[-1] * (1 - slippage)
+            close_commission = final_position * close_price * self.config.commission_rate
+            self.capital += final_position * close_price - close_commission
+            self.total_commission += close_commission
+            self.total_slippage += (prices[-1] - close_price) * final_position
+        
+        self.trades = extract_trades(
+            result, data.index, symbol, Trade, OrderSide.SELL,
+            close_price=close_price, close_commission=close_commission
+        )
+        self.total_pnl = sum(t.pnl for t in self.trades)
         
-        # Calculate performance metrics
         results = self._calculate_metrics()
         
-        self.logger.info("Backtest complete")
+        self.logger.info("Vectorized backtest complete")
+        
+        return results
+    
+    def run_portfolio(
+        self,
+        data: pd.DataFrame,
+        rebalance: Callable,
+        symbols: Optional[List[str]] = None,
+        min_trade_weight: float = 0.0
+    ) -> Dict:
+        """
+        Run a multi-asset target-weight backtest.
+        
+        Positions, prices and entry prices are kept as NumPy vectors over
+        symbols, so each bar costs a few vector operations regardless of
+        the number of symbols (see portfolio.py).
+        
+        Args:
+            data: DataFrame with one price column per symbol
+            rebalance: Function (HistoryView, current weights) returning
+                       target weights or None
+            symbols: Traded columns (default: all)
+            min_trade_weight: Skip orders smaller than this fraction of equity
+        
+        Returns:
+            Dictionary with backtest results (same keys as run_backtest,
+            plus n_rebalances)
+        """
+        from backtesting.portfolio import simulate_portfolio
+        
+        self.logger.info("Starting portfolio backtest...")
+        self._reset(len(data))
+        
+        result = simulate_portfolio(data, rebalance, self.config, symbols, min_trade_weight)
+        
+        self._record_equity(result.equity, data.index)
+        self.trades = result.trades
+        self.fills = result.fills
+        self.total_commission = result.total_commission
+        self.total_slippage = result.total_slippage
+        self.total_pnl = result.total_pnl
+        
+        results = self._calculate_metrics()
+        results['n_rebalances'] = result.n_rebalances
+        
+        self.logger.info("Portfolio backtest complete")
+        
+        return results
+        
+    def run_tick_replay(
+        self,
+        ticks: pd.DataFrame,
+        strategy: Callable,
+        replay_config=None,
+        symbol: str = 'BTC'
+    ) -> Dict:
+        """
+        Replay individual trades with order latency and market impact.
+        
+        Orders reach the exchange after a sampled latency and fill at the
+        prevailing trade price plus slippage and square-root market impact
+        (market_impact_coef); see tick_replay.py.
+        
+        Args:
+            ticks: DatetimeIndex-ed trades with 'price' and optional 'size'
+            strategy: Function (TickContext) returning a signal or None
+            replay_config: TickReplayConfig (latency, impact window,
+                           equity resampling interval)
+            symbol: Symbol recorded in trades and fills
+        
+        Returns:
+            Dictionary with backtest results (same keys as run_backtest,
+            on equity resampled to equity_interval, plus n_events,
+            mean_latency_ms and tick_equity)
+        """
+        from backtesting.tick_replay import TickReplayConfig, replay_ticks
+        
+        replay_config = replay_config or TickReplayConfig()
+        
+        self.logger.info("Starting tick replay...")
+        self._reset()
+        
+        result = replay_ticks(ticks, strategy, self.config, replay_config, symbol)
+        sampled = result.equity.resample(replay_config.equity_interval).last().dropna()
+        
+        self._record_equity(sampled.to_numpy(), sampled.index)
+        self.trades = result.trades
+        self.fills = result.fills
+        self.total_commission = result.total_commission
+        self.total_slippage = result.total_slippage
+        self.total_pnl = result.total_pnl
+        
+        results = self._calculate_metrics()
+        results['n_events'] = result.n_events
+        results['mean_latency_ms'] = float(result.latency_ns.mean() / 1e6) if len(result.latency_ns) else 0.0
+        results['tick_equity'] = result.equity
+        
+        self.logger.info("Tick replay complete")
         
         return results
     
@@ -198,6 +503,12 @@ class BacktestEngine:
         """
         Run walk-forward analysis.
         
+        Every window is trained and backtested on its own engine; with
+        `config.walk_forward_workers > 1` windows run in a process pool
+        over shared-memory data (see walk_forward.py). With
+        `config.checkpoint_dir` set, finished windows are saved as they
+        complete and skipped when the same run is started again.
+        
         Args:
             data: DataFrame with OHLCV data
             strategy_factory: Function that creates and trains strategy
@@ -208,41 +519,24 @@ class BacktestEngine:
         """
         self.logger.info("Starting walk-forward analysis...")
         
-        results = []
-        
-        # Calculate number of windows
-        total_days = len(data)
-        train_days = self.config.train_period_days
-        test_days = self.config.test_period_days
-        step_days = self.config.step_days
+        windows = walk_forward_windows(
+            len(data),
+            self.config.train_period_days,
+            self.config.test_period_days,
+            self.config.step_days
+        )
         
-        start_idx = 0
+        checkpoint = None
+        if self.config.checkpoint_dir is not None:
+            checkpoint = WalkForwardCheckpoint(
+                self.config.checkpoint_dir,
+                run_key(data, self.config, strategy_factory, strategy_params)
+            )
         
-        while start_idx + train_days + test_days <= total_days:
-            # Split data
-            train_end = start_idx + train_days
-            test_end = train_end + test_days
-            
-            train_data = data.iloc[start_idx:train_end]
-            test_data = data.iloc[train_end:test_end]
-            
-            self.logger.info(f"Window: train={train_data.index[0]} to {train_data.index[-1]}, "
-                           f"test={test_data.index[0]} to {test_data.index[-1]}")
-            
-            # Train strategy
-            strategy = strategy_factory(train_data, **strategy_params)
-            
-            # Test strategy
-            result = self.run_backtest(test_data, strategy)
-            result['train_start'] = train_data.index[0]
-            result['train_end'] = train_data.index[-1]
-            result['test_start'] = test_data.index[0]
-            result['test_end'] = test_data.index[-1]
-            
-            results.append(result)
-            
-            # Move window forward
-            start_idx += step_days
+        results = run_windows(
+            data, windows, strategy_factory, self.config,
+            strategy_params, self.config.walk_forward_workers, checkpoint
+        )
         
         # Aggregate results
         aggregated = self._aggregate_walk_forward_results(results)
@@ -251,14 +545,15 @@ class BacktestEngine:
         
         return aggregated
     
-    def _reset(self):
-        """Reset backtest state."""
+    def _reset(self, size_hint: int = 1024):
+        """Reset backtest state (`size_hint`: expected bars, preallocated)."""
         self.capital = self.config.initial_capital
         self.positions = {}
-        self.orders = []
+        self.pending_orders = deque()
+        self.fills = FillLog()
         self.trades = []
-        self.equity_curve = [self.capital]
-        self.timestamps = []
+        self.equity_curve = EquityBuffer(self.capital, size_hint, self.config.equity_buffer_size)
+        self.metrics = OnlineMetrics(self.capital)
         self.total_pnl = 0.0
         self.total_commission = 0.0
         self.total_slippage = 0.0
@@ -274,7 +569,8 @@ class BacktestEngine:
     
     def _execute_orders(self, bar: pd.Series):
         """Execute pending orders."""
-        for order in self.orders:
+        while self.pending_orders:
+            order = self.pending_orders.popleft()
             if order.status == OrderStatus.PENDING:
                 # Calculate fill price with slippage
                 if self.config.use_market_orders:
@@ -296,6 +592,10 @@ class BacktestEngine:
                 
                 self.total_commission += commission
                 self.total_slippage += abs(fill_price - order.price) * abs(order.quantity)
+                self.fills.append(
+                    order.symbol, 1 if order.side == OrderSide.BUY else -1, order.quantity,
+                    order.price, fill_price, commission, order.timestamp, order.fill_timestamp
+                )
                 
                 # Update positions
                 if order.side == OrderSide.BUY:
@@ -409,7 +709,7 @@ class BacktestEngine:
             price=price,
             timestamp=timestamp
         )
-        self.orders.append(order)
+        self.pending_orders.append(order)
     
     def _close_all_positions(self, bar: pd.Series, timestamp: datetime):
         """Close all open positions."""
@@ -429,28 +729,37 @@ class BacktestEngine:
         
         return equity
     
+    def _record_equity(self, equity: np.ndarray, index: pd.DatetimeIndex):
+        """Record a whole equity curve at once (vectorized modes)."""
+        self.equity_curve.extend(equity, index)
+        self.metrics.extend(equity)
+    
+    def live_metrics(self) -> Dict:
+        """
+        Metrics of the run so far.
+        
+        Return, Sharpe, Sortino and drawdown come from the online
+        accumulators, so this is O(1) and can be called mid-run (e.g. from
+        a strategy holding the engine, or another thread).
+        """
+        snapshot = self.metrics.snapshot()
+        snapshot['total_trades'] = len(self.trades)
+        snapshot['total_commission'] = self.total_commission
+        return snapshot
+    
     def _calculate_metrics(self) -> Dict:
         """Calculate comprehensive performance metrics."""
-        equity_curve = np.array(self.equity_curve)
+        # Return, risk and drawdown were accumulated bar by bar
+        metrics = self.metrics
+        total_return = metrics.total_return
+        sharpe_ratio = metrics.sharpe_ratio
+        sortino_ratio = metrics.sortino_ratio
+        max_drawdown = metrics.max_drawdown * 100
+        
+        # Held equity points (the most recent ones with equity_buffer_size set)
+        equity_curve = self.equity_curve.values()
         returns = np.diff(equity_curve) / equity_curve[:-1]
         
-        # Basic metrics
-        total_return = (equity_curve[-1] / equity_curve[0] - 1) * 100
-        
-        # Risk metrics
-        sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252) if len(returns) > 0 else 0
-        
-        # Sortino ratio (downside deviation)
-        downside_returns = returns[returns < 0]
-        downside_std = np.std(downside_returns) if len(downside_returns) > 0 else 0
-        sortino_ratio = np.mean(returns) / downside_std * np.sqrt(252) if downside_std > 0 else 0
-        
-        # Maximum drawdown
-        cumulative = np.cumprod(1 + returns)
-        running_max = np.maximum.accumulate(cumulative)
-        drawdown = (cumulative - running_max) / running_max
-        max_drawdown = np.min(drawdown) * 100 if len(drawdown) > 0 else 0
-        
         # Win rate
         winning_trades = [t for t in self.trades if t.pnl > 0]
         win_rate = len(winning_trades) / len(self.trades) * 100 if self.trades else 0
@@ -477,9 +786,11 @@ class BacktestEngine:
             'avg_loss': avg_loss,
             'total_commission': self.total_commission,
             'total_slippage': self.total_slippage,
-            'final_equity': equity_curve[-1],
+            'final_equity': metrics.equity,
+            'initial_capital': self.config.initial_capital,
             'equity_curve': equity_curve,
             'returns': returns,
+            'equity_truncated': len(self.equity_curve) < self.equity_curve.total_points,
             'trades': self.trades
         }
     
@@ -0,0 +1,278 @@
+"""
+Checkpoint and Resume for Long Backtests and Walk-Forward Runs
+
+Engine state lives only in the BacktestEngine object, so an interrupted
+multi-hour run used to start over. With `BacktestConfig.checkpoint_dir`
+set:
+
+- `run_walk_forward` writes every finished window's results to
+  {checkpoint_dir}/window-{start}-{train_end}-{test_end}.pkl as soon as
+  it completes; rerunning the same call loads finished windows instead
+  of recomputing them
+- `run_backtest` saves engine state (cash, positions, pending orders,
+  trades, fill log, equity curve) every `checkpoint_every` bars to
+  {checkpoint_dir}/backtest-{key}.ckpt and resumes from it; the file is
+  removed once the backtest completes
+
+Checkpoints are written to a temporary file and renamed, so a process
+killed mid-write leaves the previous checkpoint intact. Every checkpoint
+is tied to a run key (hash of the data, the result-relevant config, the
+strategy and its parameters); a walk-forward directory holding a
+different run is rejected rather than silently mixed in.
+
+Strategies are identified by name and a fingerprint of their code
+(bytecode, constants, and captured closure, default and instance values),
+so an edited strategy does not resume a run of its previous revision.
+Lambdas, partials and callables without code cannot be fingerprinted
+reliably; they need an explicit version (the `version` argument of
+`run_key`, or a `key_version` attribute on the callable) and are rejected
+without one.
+
+Resuming a backtest replays nothing: strategies must be functions of the
+history they are given (as run_backtest assumes), and HistoryView
+indicators rebuild from the data on first use.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import pickle
+import types
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+
+# Config fields that do not change results
+_RUNTIME_FIELDS = frozenset({'checkpoint_dir', 'checkpoint_every', 'walk_forward_workers'})
+
+
+def data_fingerprint(data: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, index and column names)."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(repr(list(data.columns)).encode())
+    return digest.hexdigest()
+
+
+def qualified_name(fn: Optional[Callable]) -> str:
+    if fn is None:
+        return ''
+    return f"{fn.__module__}.{getattr(fn, '__qualname__', type(fn).__qualname__)}"
+
+
+def _update_digest(digest, value, seen: set):
+    """Feed code, plain values and arrays into a hash (other objects by type)."""
+    if isinstance(value, types.CodeType):
+        digest.update(value.co_code)
+        digest.update(repr(value.co_names).encode())
+        for const in value.co_consts:
+            _update_digest(digest, const, seen)
+    elif isinstance(value, types.FunctionType):
+        if id(value) in seen:
+            return
+        seen.add(id(value))
+        _update_digest(digest, value.__code__, seen)
+        for cell in value.__closure__ or ():
+            _update_digest(digest, cell.cell_contents, seen)
+        _update_digest(digest, value.__defaults__, seen)
+        _update_digest(digest, value.__kwdefaults__, seen)
+    elif isinstance(value, np.ndarray):
+        digest.update(f'{value.dtype}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _update_digest(digest, item, seen)
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode())
+            _update_digest(digest, value[key], seen)
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        digest.update(repr(value).encode())
+    else:
+        # Engines, models etc. hold run state; only their type is part of the identity
+        digest.update(qualified_name(type(value)).encode())
+
+
+def code_fingerprint(fn: Callable) -> str:
+    """
+    Hash of a callable's code and the values it captures.
+
+    Functions (and bound methods) hash their bytecode, constants, closure
+    cells and defaults; callable instances hash their class's `__call__`
+    and their attributes. Captured numbers, strings, containers and arrays
+    are hashed by value, other objects by type.
+    """
+    fn = getattr(fn, '__func__', fn)
+    digest = hashlib.sha256()
+    seen = set()
+    if hasattr(fn, '__code__'):
+        _update_digest(digest, fn, seen)
+    else:
+        _update_digest(digest, type(fn).__call__, seen)
+        _update_digest(digest, vars(fn), seen)
+    return digest.hexdigest()
+
+
+def code_key(fn: Optional[Callable], version: Optional[str] = None) -> str:
+    """
+    Identity of a strategy (or factory) in run and cache keys.
+
+    Args:
+        fn: Function, bound method or callable instance
+        version: Explicit revision (default: the callable's `key_version`
+                 attribute); replaces the code fingerprint
+
+    Raises:
+        ValueError: For lambdas, partials and callables without code when
+                    no version is given
+    """
+    if fn is None:
+        return ''
+    if version is None:
+        version = getattr(fn, 'key_version', None)
+    if version is not None:
+        return f"{qualified_name(fn)}@{version}"
+    func = getattr(fn, '__func__', fn)
+    if (isinstance(fn, functools.partial) or getattr(func, '__name__', None) == '<lambda>'
+            or not (hasattr(func, '__code__') or hasattr(type(fn).__call__, '__code__'))):
+        raise ValueError(f"Cannot fingerprint {qualified_name(fn)}: pass a version "
+                         f"(or set its key_version attribute) to identify its revision")
+    return f"{qualified_name(fn)}:{code_fingerprint(fn)}"
+
+
+def result_settings(config) -> Dict:
+    """Config fields that affect results (runtime-only fields dropped)."""
+    return {k: v for k, v in dataclasses.asdict(config).items() if k not in _RUNTIME_FIELDS}
+
+
+def run_key(data: pd.DataFrame, config, fn: Callable, params: Dict, version: Optional[str] = None) -> str:
+    """Identity of a run: data, result-relevant config, strategy and parameters."""
+    payload = json.dumps({
+        'data': data_fingerprint(data),
+        'config': result_settings(config),
+        'fn': code_key(fn, version),
+        'params': params,
+    }, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def save_pickle(path: str, obj):
+    """Write-then-rename so readers never see a partial file."""
+    with open(f'{path}.tmp', 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f'{path}.tmp', path)
+
+
+def load_pickle(path: str):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class WalkForwardCheckpoint:
+    """
+    Directory of finished walk-forward window results.
+
+    Args:
+        directory: Checkpoint directory
+        key: Run key; a directory created for another run is rejected
+    """
+
+    def __init__(self, directory: str, key: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        manifest = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                stored = json.load(f)['key']
+            if stored != key:
+                raise ValueError(
+                    f"Checkpoint directory {directory} belongs to a different walk-forward run"
+                )
+        else:
+            with open(f'{manifest}.tmp', 'w') as f:
+                json.dump({'key': key}, f)
+            os.replace(f'{manifest}.tmp', manifest)
+
+    def _path(self, window: Tuple[int, int, int]) -> str:
+        return os.path.join(self.directory, 'window-{}-{}-{}.pkl'.format(*window))
+
+    def load(self, window: Tuple[int, int, int]) -> Optional[Dict]:
+        path = self._path(window)
+        return load_pickle(path) if os.path.exists(path) else None
+
+    def save(self, window: Tuple[int, int, int], result: Dict):
+        save_pickle(self._path(window), result)
+
+
+class BacktestCheckpoint:
+    """
+    Periodic engine-state checkpoint of one run_backtest call.
+
+    Args:
+        directory: Checkpoint directory
+        key: Run key
+        every: Bars between checkpoints
+    """
+
+    def __init__(self, directory: str, key: str, every: int):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'backtest-{key[:16]}.ckpt')
+        self.every = every
+
+    def due(self, bars_done: int) -> bool:
+        return bars_done % self.every == 0
+
+    def save(self, engine, bars_done: int):
+        save_pickle(self.path, {
+            'bars_done': bars_done,
+            'capital': engine.capital,
+            'positions': engine.positions,
+            'pending_orders': list(engine.pending_orders),
+            'trades': engine.trades,
+            'fills': engine.fills,
+            'equity_curve': engine.equity_curve,
+            'metrics': engine.metrics,
+            'total_pnl': engine.total_pnl,
+            'total_commission': engine.total_commission,
+            'total_slippage': engine.total_slippage,
+        })
+        logger.debug(f"Checkpointed backtest after {bars_done} bars to {self.path}")
+
+    def restore(self, engine) -> int:
+        """
+        Load saved state into `engine`.
+
+        Returns:
+            Number of bars already processed (0 without a checkpoint)
+        """
+        if not os.path.exists(self.path):
+            return 0
+
+        state = load_pickle(self.path)
+        bars_done = state['bars_done']
+        engine.capital = state['capital']
+        engine.positions = state['positions']
+        engine.pending_orders = deque(state['pending_orders'])
+        engine.trades = state['trades']
+        engine.fills = state['fills']
+        engine.equity_curve = state['equity_curve']
+        engine.metrics = state['metrics']
+        engine.total_pnl = state['total_pnl']
+        engine.total_commission = state['total_commission']
+        engine.total_slippage = state['total_slippage']
+
+        logger.info(f"Resuming backtest after {bars_done} bars from {self.path}")
+        return bars_done
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,100 @@
+"""
+Append-Only, Array-Backed Fill Log
+
+The event-driven engine used to keep every order it ever placed in one
+list and rescan it for pending orders on every bar, so per-bar cost grew
+with the number of orders placed. Pending orders now live in a queue that
+is drained each bar, and executed orders are appended to a `FillLog`: one
+preallocated NumPy array per field (struct-of-arrays) that doubles its
+capacity when full, so appends are amortized O(1) and a fill costs a few
+array slots instead of an Order object.
+
+Columns:
+    symbol          Traded symbol
+    side            +1 buy, -1 sell
+    quantity        Filled units
+    price           Order (reference) price
+    fill_price      Execution price including slippage
+    commission      Commission paid
+    timestamp       Bar at which the order was placed
+    fill_timestamp  Bar at which the order was filled
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+FILL_COLUMNS = {
+    'symbol': object,
+    'side': np.int8,
+    'quantity': np.float64,
+    'price': np.float64,
+    'fill_price': np.float64,
+    'commission': np.float64,
+    'timestamp': object,
+    'fill_timestamp': object,
+}
+
+
+class FillLog:
+    """
+    Growable struct-of-arrays log of executed orders.
+
+    Args:
+        capacity: Initial number of rows to allocate
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.empty(capacity, dtype=dtype) for name, dtype in FILL_COLUMNS.items()
+        }
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self):
+        for name, values in self._columns.items():
+            grown = np.empty(max(2 * len(values), 1), dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
+
+    def append(
+        self,
+        symbol: str,
+        side: int,
+        quantity: float,
+        price: float,
+        fill_price: float,
+        commission: float,
+        timestamp,
+        fill_timestamp
+    ):
+        """Record one fill."""
+        if self._size == len(self._columns['side']):
+            self._grow()
+
+        i = self._size
+        columns = self._columns
+        columns['symbol'][i] = symbol
+        columns['side'][i] = side
+        columns['quantity'][i] = quantity
+        columns['price'][i] = price
+        columns['fill_price'][i] = fill_price
+        columns['commission'][i] = commission
+        columns['timestamp'][i] = timestamp
+        columns['fill_timestamp'][i] = fill_timestamp
+        self._size += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of the recorded values of one column."""
+        values = self._columns[name][:self._size]
+        values.flags.writeable = False
+        return values
+
+    def to_frame(self) -> pd.DataFrame:
+        """All fills as a DataFrame (copies)."""
+        return pd.DataFrame({name: values[:self._size].copy() for name, values in self._columns.items()})
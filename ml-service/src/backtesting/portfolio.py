@@ -0,0 +1,381 @@
+"""
+Multi-Asset Portfolio Backtesting with Vectorized Mark-to-Market
+
+The event-driven engine keeps a dict of Position objects and prices them
+one `bar[symbol]` lookup at a time, which is fine for a handful of symbols
+and slow for 500-name portfolios. In portfolio mode the state lives in
+NumPy vectors indexed by symbol id:
+
+    prices[i]    (n_assets,) prices at bar i (rows of a C-contiguous matrix)
+    quantity     (n_assets,) units held
+    entry_price  (n_assets,) average-cost entry price
+    pending      (n_assets,) net order placed at the previous bar
+
+so mark-to-market and equity (`capital + quantity @ prices[i]`),
+stop-loss / take-profit checks and order fills are single vector
+operations per bar. Only assets that actually trade are touched
+individually, to append fills and trades.
+
+Strategies are rebalancers: `rebalance(history, weights)` receives the
+HistoryView of the data and the current weight vector and returns target
+weights (or None to hold). `msrr_rebalancer` plugs MSRROptimizer in this
+way.
+
+Execution model (same as the event-driven engine):
+- Orders are placed at bar i's price and filled at bar i+1 at that price
+  ± slippage_bps; commission_rate applies to every fill
+- Long-only: negative weights are clipped to 0, each weight to
+  max_position_size, and the sum of weights to max_leverage
+- Orders are netted per asset and bar; an asset hitting its stop-loss or
+  take-profit is sold in full, overriding that bar's target
+- Assets without a valid (finite, positive) price at a bar are not
+  traded at that bar and are marked at their last valid price; targets
+  for them are ignored, and positions are closed at the last valid prices
+
+Usage:
+    rebalance = msrr_rebalancer(MSRROptimizer(), lookback=63, every=21)
+    results = BacktestEngine(config).run_portfolio(prices, rebalance)
+"""
+
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+import logging
+
+from backtesting.fill_log import FillLog
+from backtesting.history import HistoryView
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PortfolioResult:
+    """Outcome of a portfolio simulation."""
+    equity: np.ndarray        # Equity after each bar
+    trades: List              # Closed trades (Trade)
+    fills: FillLog            # Executed orders
+    total_commission: float
+    total_slippage: float
+    total_pnl: float
+    n_rebalances: int
+
+
+class _PortfolioState:
+    """Vector state of a long-only portfolio."""
+
+    def __init__(self, symbols: List[str], timestamps: pd.Index, config):
+        from backtesting.backtest_engine import OrderSide, Trade
+
+        n_assets = len(symbols)
+        self.symbols = symbols
+        self.timestamps = timestamps
+        self.config = config
+        self.trade_cls = Trade
+        self.sell_side = OrderSide.SELL
+
+        self.capital = config.initial_capital
+        self.quantity = np.zeros(n_assets)
+        self.entry_price = np.zeros(n_assets)
+        self.entry_bar = np.zeros(n_assets, dtype=np.int64)
+        self.pending = np.zeros(n_assets)
+        self.order_price = np.zeros(n_assets)
+        self.order_bar = 0
+
+        self.trades = []
+        self.fills = FillLog()
+        self.total_commission = 0.0
+        self.total_slippage = 0.0
+        self.total_pnl = 0.0
+
+    def place(self, orders: np.ndarray, prices: np.ndarray, bar: int):
+        """Queue net orders (units) at this bar's prices."""
+        self.pending = orders
+        self.order_price = prices.copy()
+        self.order_bar = bar
+
+    def execute(self, bar: int):
+        """Fill the pending orders."""
+        orders = self.pending
+        traded = np.flatnonzero(orders)
+        if len(traded) == 0:
+            return
+        self.pending = np.zeros_like(orders)
+
+        qty = orders[traded]
+        price = self.order_price[traded]
+        slippage = self.config.slippage_bps / 10000 if self.config.use_market_orders else 0.0
+        fill_price = price * (1 + slippage * np.sign(qty))
+        commission = np.abs(qty * fill_price) * self.config.commission_rate
+
+        self.total_commission += commission.sum()
+        self.total_slippage += (np.abs(fill_price - price) * np.abs(qty)).sum()
+
+        held = self.quantity[traded]
+        buy = qty > 0
+
+        # Buys: average-cost entry price
+        b = traded[buy]
+        new_quantity = held[buy] + qty[buy]
+        opening = held[buy] <= 0
+        self.entry_price[b] = (self.entry_price[b] * held[buy] + fill_price[buy] * qty[buy]) / new_quantity
+        self.entry_bar[b[opening]] = bar
+        self.quantity[b] = new_quantity
+        self.capital -= (qty[buy] * fill_price[buy] + commission[buy]).sum()
+
+        # Sells: close up to the held quantity
+        s = traded[~buy]
+        sell_price = fill_price[~buy]
+        close = np.minimum(-qty[~buy], held[~buy])
+        pnl = (sell_price - self.entry_price[s]) * close - commission[~buy]
+        self.capital += (close * sell_price - commission[~buy]).sum()
+        self.total_pnl += pnl[close > 0].sum()
+
+        exit_timestamp = self.timestamps[bar]
+        for k in np.flatnonzero(close > 0):
+            asset = s[k]
+            entry_timestamp = self.timestamps[self.entry_bar[asset]]
+            self.trades.append(self.trade_cls(
+                symbol=self.symbols[asset],
+                side=self.sell_side,
+                quantity=close[k],
+                entry_price=self.entry_price[asset],
+                exit_price=sell_price[k],
+                entry_timestamp=entry_timestamp,
+                exit_timestamp=exit_timestamp,
+                pnl=pnl[k],
+                return_pct=(sell_price[k] / self.entry_price[asset] - 1) * 100,
+                holding_period=exit_timestamp - entry_timestamp
+            ))
+
+        self.quantity[s] = held[~buy] - close
+        self.quantity[self.quantity <= 1e-12] = 0.0
+
+        order_timestamp = self.timestamps[self.order_bar]
+        for k, asset in enumerate(traded):
+            self.fills.append(self.symbols[asset], 1 if qty[k] > 0 else -1, abs(qty[k]), price[k],
+                              fill_price[k], commission[k], order_timestamp, exit_timestamp)
+
+    def risk_exits(self, prices: np.ndarray) -> np.ndarray:
+        """Mask of held assets that hit their stop-loss or take-profit."""
+        held = self.quantity > 0
+        return_pct = np.zeros_like(prices)
+        return_pct[held] = (prices[held] / self.entry_price[held] - 1) * 100
+
+        triggered = np.zeros(len(prices), dtype=bool)
+        if self.config.stop_loss_pct is not None:
+            triggered |= held & (return_pct <= -self.config.stop_loss_pct)
+        if self.config.take_profit_pct is not None:
+            triggered |= held & (return_pct >= self.config.take_profit_pct)
+        return triggered
+
+
+def clip_weights(weights: np.ndarray, max_position_size: float, max_leverage: float) -> np.ndarray:
+    """Long-only weights within the per-position and leverage limits."""
+    weights = np.clip(np.nan_to_num(np.asarray(weights, dtype=np.float64)), 0.0, max_position_size)
+    total = weights.sum()
+    if total > max_leverage:
+        weights *= max_leverage / total
+    return weights
+
+
+def simulate_portfolio(
+    data: pd.DataFrame,
+    rebalance: Callable,
+    config,
+    symbols: Optional[List[str]] = None,
+    min_trade_weight: float = 0.0
+) -> PortfolioResult:
+    """
+    Run a target-weight strategy over a multi-asset price table.
+
+    Args:
+        data: Prices, one column per symbol (other columns are visible to
+              the strategy but not traded)
+        rebalance: (HistoryView, current weights) -> target weights or None
+        config: BacktestConfig
+        symbols: Traded columns (default: all)
+        min_trade_weight: Skip orders smaller than this fraction of equity
+
+    Returns:
+        PortfolioResult (equity before the final close-out)
+    """
+    symbols = list(symbols if symbols is not None else data.columns)
+    prices = np.ascontiguousarray(data[symbols].to_numpy(dtype=np.float64))
+    history = HistoryView(data)
+    state = _PortfolioState(symbols, data.index, config)
+
+    n_bars = len(prices)
+    equity = np.empty(n_bars)
+    mark = np.zeros(len(symbols))  # Last valid price per asset
+    check_risk = config.stop_loss_pct is not None or config.take_profit_pct is not None
+    n_rebalances = 0
+
+    for i in range(n_bars):
+        p = prices[i]
+        tradeable = np.isfinite(p) & (p > 0)
+        mark[tradeable] = p[tradeable]
+        history.advance(i + 1)
+
+        state.execute(i)
+
+        orders = None
+        if i >= config.execution_delay:
+            current_equity = state.capital + state.quantity @ mark
+            weights = state.quantity * mark / current_equity
+            targets = rebalance(history, weights)
+
+            if targets is not None:
+                n_rebalances += 1
+                targets = np.array(targets, dtype=np.float64)
+                targets[~tradeable] = weights[~tradeable]  # Held as is
+                targets = clip_weights(targets, config.max_position_size, config.max_leverage)
+                delta = targets - weights
+                delta[np.abs(delta) <= min_trade_weight] = 0.0
+                delta[~tradeable] = 0.0
+                orders = np.zeros_like(p)
+                orders[tradeable] = delta[tradeable] * current_equity / p[tradeable]
+
+        if check_risk:
+            exits = state.risk_exits(mark) & tradeable
+            if exits.any():
+                if orders is None:
+                    orders = np.zeros_like(p)
+                orders[exits] = -state.quantity[exits]
+
+        if orders is not None:
+            state.place(orders, p, i)
+
+        equity[i] = state.capital + state.quantity @ mark
+
+    # Orders from the last bar fill at its prices, then everything is closed
+    if n_bars > 0:
+        state.execute(n_bars - 1)
+        held = state.quantity > 0
+        if held.any():
+            state.place(np.where(held, -state.quantity, 0.0), mark, n_bars - 1)
+            state.execute(n_bars - 1)
+
+    return PortfolioResult(
+        equity=equity,
+        trades=state.trades,
+        fills=state.fills,
+        total_commission=state.total_commission,
+        total_slippage=state.total_slippage,
+        total_pnl=state.total_pnl,
+        n_rebalances=n_rebalances
+    )
+
+
+def msrr_rebalancer(
+    optimizer,
+    symbols: Optional[List[str]] = None,
+    lookback: int = 63,
+    every: int = 21
+) -> Callable:
+    """
+    Rebalance to MSRROptimizer weights every `every` bars.
+
+    Args:
+        optimizer: MSRROptimizer
+        symbols: Price columns to optimize over, in the portfolio's symbol
+                 order (default: all columns)
+        lookback: Bars of returns fed to the optimizer
+        every: Bars between rebalances
+
+    Returns:
+        Rebalance function for simulate_portfolio
+    """
+    def rebalance(history: HistoryView, weights: np.ndarray) -> Optional[np.ndarray]:
+        n = len(history)
+        if n <= lookback or (n - 1) % every != 0:
+            return None
+        columns = symbols if symbols is not None else list(history.columns)
+        window = np.column_stack([history[s][n - lookback - 1:] for s in columns])
+        # Only assets priced throughout the lookback are optimized
+        priced = np.all(np.isfinite(window) & (window > 0), axis=0)
+        if not priced.any():
+            return None
+        returns = np.diff(window[:, priced], axis=0) / window[:-1, priced]
+        targets = np.zeros(len(columns))
+        targets[priced] = optimizer.optimize(returns, current_weights=weights[priced])['weights']
+        return targets
+
+    return rebalance
+
+
+def create_synthetic_prices(n_bars: int = 1000, n_assets: int = 50, seed: int = 0) -> pd.DataFrame:
+    """Correlated random-walk prices for n_assets symbols."""
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.01, (n_bars, 1))
+    returns = market + rng.normal(0.0002, 0.015, (n_bars, n_assets))
+    prices = 100 * np.exp(np.cumsum(returns, axis=0))
+    return pd.DataFrame(
+        prices,
+        index=pd.date_range('2020-01-01', periods=n_bars, freq='D'),
+        columns=[f'A{i:03d}' for i in range(n_assets)]
+    )
+
+
+if __name__ == '__main__':
+    import time
+
+    from backtesting.backtest_engine import BacktestConfig, BacktestEngine
+    from optimization.msrr_optimizer import MSRROptimizer, OptimizationConfig
+
+    logging.basicConfig(level=logging.WARNING)
+
+    # Buy-and-hold without costs must equal the analytic equity
+    prices = create_synthetic_prices(n_bars=500, n_assets=20)
+    config = BacktestConfig(commission_rate=0.0, slippage_bps=0.0, max_position_size=1.0)
+    equal = np.full(20, 1 / 20)
+    hold = BacktestEngine(config).run_portfolio(
+        prices, lambda history, weights: equal if len(history) == 2 else None
+    )
+    units = equal * config.initial_capital / prices.iloc[1].to_numpy()
+    expected = config.initial_capital + units @ (prices.iloc[-1].to_numpy() - prices.iloc[1].to_numpy())
+
+    # One name listed 100 bars late (NaN prices until then)
+    late = create_synthetic_prices(n_bars=500, n_assets=10)
+    late.iloc[:100, 3] = np.nan
+    late_results = BacktestEngine(BacktestConfig(max_position_size=0.2)).run_portfolio(
+        late, lambda history, weights: np.full(10, 0.1) if (len(history) - 1) % 21 == 0 else None
+    )
+
+    # 500 names, monthly momentum rebalance
+    wide = create_synthetic_prices(n_bars=2520, n_assets=500, seed=1)
+
+    def momentum(history, weights):
+        n = len(history)
+        if n <= 63 or (n - 1) % 21 != 0:
+            return None
+        lookback = np.array([history.last(s) / history[s][-64] for s in history.columns])
+        top = np.argsort(lookback)[-50:]
+        target = np.zeros(len(lookback))
+        target[top] = 1 / 50
+        return target
+
+    start = time.perf_counter()
+    wide_results = BacktestEngine(BacktestConfig(max_position_size=0.05)).run_portfolio(wide, momentum)
+    wide_s = time.perf_counter() - start
+
+    # MSRR target weights on 20 names
+    optimizer = MSRROptimizer(OptimizationConfig(max_weight=0.2))
+    msrr = BacktestEngine(BacktestConfig(max_position_size=0.2)).run_portfolio(
+        prices, msrr_rebalancer(optimizer, lookback=63, every=21)
+    )
+
+    print(f"\n{'='*60}")
+    print("Portfolio Backtests")
+    print(f"{'='*60}")
+    print(f"Buy-and-hold:      final equity {hold['equity_curve'][-1]:.6f} "
+          f"(analytic {expected:.6f})")
+    print(f"Late listing:      final equity {late_results['equity_curve'][-1]:.2f}")
+    print(f"500-name momentum: {len(wide)} bars in {wide_s:.2f}s "
+          f"({wide_s / len(wide) * 1e6:.0f}µs per bar), {wide_results['total_trades']} trades, "
+          f"return {wide_results['total_return']:.2f}%")
+    print(f"20-name MSRR:      return {msrr['total_return']:.2f}%, sharpe {msrr['sharpe_ratio']:.2f}, "
+          f"{msrr['n_rebalances']} rebalances")
+
+    print(f"\n{'='*60}")
+    print("✅ Portfolio backtest test complete!")
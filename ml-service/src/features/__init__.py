@@ -1,4 +1,14 @@
-"""Feature engineering for Noderr Oracle Node."""
-from features.feature_engineer import FeatureEngineer
+"""Feature engineering for Noderr Oracle Node.
+
+FeatureEngineer is resolved lazily: it depends on pandas, scipy and
+scikit-learn, which are only needed once features are generated.
+"""
+import importlib
 
 __all__ = ['FeatureEngineer']
+
+
+def __getattr__(name):
+    if name == 'FeatureEngineer':
+        return importlib.import_module('features.feature_engineer').FeatureEngineer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
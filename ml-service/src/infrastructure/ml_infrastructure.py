@@ -11,18 +11,24 @@ References:
 - Redis Documentation: https://redis.io/documentation
 """
 
-import mlflow
-import mlflow.pytorch
-import redis
+from __future__ import annotations
+
 import json
 import numpy as np
-import torch
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import logging
 import hashlib
 
+from lazy_imports import lazy_import
+
+# Heavy clients are imported on first use (mlflow also resolves its
+# mlflow.pytorch flavor lazily on attribute access)
+mlflow = lazy_import('mlflow')
+redis = lazy_import('redis')
+torch = lazy_import('torch')
+
 logger = logging.getLogger(__name__)
 
 
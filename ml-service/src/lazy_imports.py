@@ -0,0 +1,215 @@
+"""
+Lazy Imports and Import-Time Profiling for the ML Service
+
+Restarts and failovers are bounded by how long `import server` takes, and
+most of that used to be spent importing dependencies of subsystems that a
+given process may never touch (pandas/scipy/sklearn for features,
+transformers for NLP, mlflow/redis for infrastructure).
+
+- `lazy_import` returns a module whose real import is deferred until the
+  first attribute access (importlib.util.LazyLoader)
+- `profile_imports` measures per-module import cost in a fresh interpreter
+  using `python -X importtime`
+- `check_startup_budget` fails if `import server` exceeds a time budget or
+  loads any module that must stay lazy
+
+Usage:
+    python -m lazy_imports                    # per-module import report
+    python -m lazy_imports --budget-ms 3000   # enforce the startup budget
+"""
+
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Heavy dependencies that `import server` must not load eagerly
+DEFERRED_MODULES = ('pandas', 'scipy', 'sklearn', 'transformers', 'mlflow', 'redis')
+
+# Startup budget for `import server` in a fresh interpreter
+DEFAULT_BUDGET_MS = 4000.0
+
+
+def lazy_import(name: str):
+    """
+    Import a module lazily.
+
+    The module object is registered in sys.modules immediately, but its
+    code only runs on first attribute access. Returns an already-imported
+    module unchanged.
+
+    Args:
+        name: Fully-qualified module name
+
+    Returns:
+        Module object (lazy until first use)
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module
+
+
+def _run_python(code: str, extra_args: Sequence[str] = ()) -> subprocess.CompletedProcess:
+    """Run a snippet in a fresh interpreter rooted at src/."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = SRC_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    return subprocess.run(
+        [sys.executable, *extra_args, '-c', code],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def profile_imports(module: str = 'server', top: int = 20) -> Dict:
+    """
+    Measure import cost per module in a fresh interpreter.
+
+    Args:
+        module: Module to import
+        top: Number of most expensive top-level packages to report
+
+    Returns:
+        Dictionary with the total cumulative import time of `module` and
+        the self and cumulative time (ms) of its most expensive top-level
+        dependencies
+    """
+    result = _run_python(f'import {module}', extra_args=('-X', 'importtime'))
+
+    packages: Dict[str, Dict[str, float]] = {}
+    total_ms = 0.0
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        top_level = name.split('.')[0]
+
+        if name == module:
+            total_ms = int(cumulative_us) / 1000
+
+        package = packages.setdefault(top_level, {'self_ms': 0.0, 'cumulative_ms': 0.0})
+        package['self_ms'] += int(self_us) / 1000
+        if name == top_level:
+            package['cumulative_ms'] = max(package['cumulative_ms'], int(cumulative_us) / 1000)
+
+    ranked = sorted(packages.items(), key=lambda item: item[1]['self_ms'], reverse=True)
+
+    return {
+        'module': module,
+        'total_ms': total_ms,
+        'packages': dict(ranked[:top]),
+    }
+
+
+def loaded_modules(module: str = 'server', candidates: Sequence[str] = DEFERRED_MODULES) -> List[str]:
+    """Return which candidate packages end up in sys.modules after importing `module`."""
+    code = (
+        f"import sys, {module}\n"
+        f"print(','.join(m for m in {tuple(candidates)!r} "
+        f"if m in sys.modules and not type(sys.modules[m]).__name__ == '_LazyModule'))"
+    )
+    output = _run_python(code).stdout.strip()
+    return [name for name in output.split(',') if name]
+
+
+def measure_import_ms(module: str = 'server', repeats: int = 3) -> float:
+    """Best-of-n wall time to import a module in a fresh interpreter."""
+    timings = []
+    for _ in range(repeats):
+        code = (
+            "import time\n"
+            "start = time.perf_counter()\n"
+            f"import {module}\n"
+            "print((time.perf_counter() - start) * 1000)"
+        )
+        timings.append(float(_run_python(code).stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def check_startup_budget(
+    budget_ms: float = DEFAULT_BUDGET_MS,
+    module: str = 'server',
+    deferred: Sequence[str] = DEFERRED_MODULES
+) -> List[str]:
+    """
+    Check the service's import-time budget.
+
+    Args:
+        budget_ms: Maximum allowed wall time for importing `module`
+        module: Entry-point module
+        deferred: Packages that must not be imported eagerly
+
+    Returns:
+        List of violations (empty if the budget holds)
+    """
+    violations = []
+
+    eager = loaded_modules(module, deferred)
+    if eager:
+        violations.append(f"'import {module}' eagerly loads deferred modules: {', '.join(eager)}")
+
+    elapsed_ms = measure_import_ms(module)
+    if elapsed_ms > budget_ms:
+        violations.append(f"'import {module}' took {elapsed_ms:.0f}ms (budget {budget_ms:.0f}ms)")
+
+    logger.info(f"'import {module}' took {elapsed_ms:.0f}ms (budget {budget_ms:.0f}ms)")
+    return violations
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ML service import-time report and budget")
+    parser.add_argument('--module', default='server', help="Module to profile")
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help="Fail if importing the module exceeds this many milliseconds")
+    parser.add_argument('--top', type=int, default=15, help="Number of packages to report")
+    args = parser.parse_args(argv)
+
+    report = profile_imports(args.module, args.top)
+
+    print(f"\n{'='*60}")
+    print(f"Import Time Report: {args.module} ({report['total_ms']:.0f}ms)")
+    print(f"{'='*60}")
+    print(f"{'package':<28}{'self ms':>12}{'cumulative ms':>16}")
+    for name, stats in report['packages'].items():
+        print(f"{name:<28}{stats['self_ms']:>12.1f}{stats['cumulative_ms']:>16.1f}")
+
+    if args.budget_ms is None:
+        return 0
+
+    violations = check_startup_budget(args.budget_ms, args.module)
+    print(f"\n{'='*60}")
+    if violations:
+        for violation in violations:
+            print(f"❌ {violation}")
+        return 1
+
+    print("✅ Startup budget met!")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -1,12 +1,24 @@
-"""ML models for Noderr Oracle Node inference."""
-from models.transformer import TransformerPredictor, TransformerConfig, create_ensemble
-from models.gaf import GAFRegimeClassifier, GAFConfig, MarketRegime
-
-__all__ = [
-    'TransformerPredictor',
-    'TransformerConfig',
-    'create_ensemble',
-    'GAFRegimeClassifier',
-    'GAFConfig',
-    'MarketRegime',
-]
+"""ML models for Noderr Oracle Node inference.
+
+Exports are resolved lazily so that importing one model module does not
+pull in the others.
+"""
+import importlib
+
+_EXPORTS = {
+    'TransformerPredictor': 'models.transformer',
+    'TransformerConfig': 'models.transformer',
+    'create_ensemble': 'models.transformer',
+    'ensemble_configs': 'models.transformer',
+    'GAFRegimeClassifier': 'models.gaf',
+    'GAFConfig': 'models.gaf',
+    'MarketRegime': 'models.gaf',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,316 @@
+"""
+Ahead-of-Time Compiled Serving for the Transformer Ensemble
+
+Eager `TransformerPredictor`s pay Python dispatch for every layer of every
+model on every request. Serving shapes are fixed at (seq_len=60,
+n_features=94) and batch sizes cluster around a few values, so each model
+can be compiled once per common batch size:
+
+- "trace": TorchScript trace, frozen and optimized for inference. Traced
+  modules can be saved offline with `save_compiled` and loaded at startup.
+- "inductor": torch.compile with static shapes. Compilation happens lazily
+  inside `warm_up`, so startup pays for it rather than the first request.
+
+`CompiledPredictor` keeps the eager model and falls back to it for batch
+sizes without a compiled variant, or permanently for a batch size whose
+compiled variant fails at runtime.
+
+References:
+- PyTorch TorchScript: https://pytorch.org/docs/stable/jit.html
+- Ansel, J., et al. (2024). PyTorch 2: Faster machine learning through
+  dynamic Python bytecode transformation and graph compilation.
+"""
+
+import os
+import time
+import torch
+import torch.nn as nn
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from models.precision import autocast, resolve_autocast_dtype
+from models.transformer import TransformerPredictor, create_ensemble
+
+logger = logging.getLogger(__name__)
+
+COMPILE_BACKENDS = ('trace', 'inductor')
+DEFAULT_BATCH_SIZES = (1, 8, 32)
+
+
+class CompiledPredictor:
+    """
+    Drop-in replacement for TransformerPredictor.predict backed by
+    per-batch-size compiled modules with an eager fallback.
+    """
+
+    def __init__(
+        self,
+        model: TransformerPredictor,
+        compiled: Dict[int, Callable],
+        backend: str
+    ):
+        self.model = model.eval()
+        self.config = model.config
+        self.device = model.device
+        self.backend = backend
+        self.compiled = dict(compiled)
+
+    @property
+    def batch_sizes(self) -> List[int]:
+        """Batch sizes that currently have a compiled variant."""
+        return sorted(self.compiled)
+
+    def __call__(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        return self.forward(x)
+
+    def forward(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Forward pass through the compiled variant for this batch size, if any."""
+        batch_size = x.size(0)
+        compiled = self.compiled.get(batch_size)
+
+        if compiled is not None:
+            try:
+                return compiled(x)
+            except Exception as e:
+                logger.warning(
+                    f"Compiled ({self.backend}) forward failed for batch size {batch_size}, "
+                    f"falling back to eager: {str(e)}"
+                )
+                self.compiled.pop(batch_size, None)
+
+        return self.model(x)
+
+    def predict(self, features: torch.Tensor) -> Dict[str, List[float]]:
+        """Same contract as TransformerPredictor.predict."""
+        if features.dim() == 2:
+            features = features.unsqueeze(0)
+
+        features = features.to(self.device)
+
+        with torch.no_grad(), autocast(self.config.precision, self.device):
+            pred_return, pred_vol, pred_conf = self.forward(features)
+
+        return {
+            'return': pred_return.squeeze(-1).float().cpu().numpy().tolist(),
+            'volatility': pred_vol.squeeze(-1).float().cpu().numpy().tolist(),
+            'confidence': pred_conf.squeeze(-1).float().cpu().numpy().tolist()
+        }
+
+
+def _example_input(model: TransformerPredictor, batch_size: int) -> torch.Tensor:
+    return torch.randn(
+        batch_size, model.config.seq_len, model.config.n_features, device=model.device
+    )
+
+
+def _trace(model: TransformerPredictor, batch_size: int) -> Callable:
+    """TorchScript-trace a model for one batch size and optimize for inference."""
+    with torch.no_grad():
+        traced = torch.jit.trace(model, _example_input(model, batch_size), check_trace=False)
+
+    # Freezing drops autocast, so reduced-precision graphs run unfrozen under
+    # the autocast context in predict()
+    if resolve_autocast_dtype(model.config.precision, model.device) is not None:
+        return traced
+
+    try:
+        return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+    except Exception as e:
+        logger.debug(f"Inference optimization skipped: {str(e)}")
+        return traced
+
+
+def _inductor(model: TransformerPredictor, batch_size: int) -> Callable:
+    """Wrap a model with torch.compile for static shapes."""
+    return torch.compile(model, dynamic=False)
+
+
+def compile_predictor(
+    model: TransformerPredictor,
+    backend: str = 'trace',
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    warmup_iters: int = 3
+) -> CompiledPredictor:
+    """
+    Compile a TransformerPredictor for a set of batch sizes.
+
+    Batch sizes that fail to compile or warm up are served eagerly.
+
+    Args:
+        model: Model to compile (switched to eval mode)
+        backend: "trace" or "inductor"
+        batch_sizes: Batch sizes to compile
+        warmup_iters: Warm-up iterations per batch size
+
+    Returns:
+        CompiledPredictor wrapping the model
+    """
+    if backend not in COMPILE_BACKENDS:
+        raise ValueError(f"Unknown compile backend '{backend}', expected one of {COMPILE_BACKENDS}")
+
+    model.eval()
+    compile_fn = _trace if backend == 'trace' else _inductor
+
+    compiled = {}
+    for batch_size in batch_sizes:
+        try:
+            compiled[batch_size] = compile_fn(model, batch_size)
+        except Exception as e:
+            logger.warning(f"Compilation ({backend}) failed for batch size {batch_size}: {str(e)}")
+
+    predictor = CompiledPredictor(model, compiled, backend)
+    warm_up(predictor, batch_sizes, warmup_iters)
+
+    return predictor
+
+
+def warm_up(
+    predictor: CompiledPredictor,
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    iters: int = 3
+):
+    """
+    Run synthetic batches through every compiled variant.
+
+    Triggers lazy compilation, allocator growth and kernel selection up
+    front. Variants that fail here are dropped in favour of eager.
+    """
+    with torch.no_grad(), autocast(predictor.config.precision, predictor.device):
+        for batch_size in batch_sizes:
+            x = _example_input(predictor.model, batch_size)
+            for _ in range(iters):
+                predictor.forward(x)
+
+
+def compile_ensemble(
+    ensemble: Dict[str, TransformerPredictor],
+    backend: str = 'trace',
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    warmup_iters: int = 3
+) -> Dict[str, CompiledPredictor]:
+    """Compile every model of the NN1-NN5 ensemble."""
+    compiled = {}
+    for name, model in ensemble.items():
+        start = time.perf_counter()
+        compiled[name] = compile_predictor(model, backend, batch_sizes, warmup_iters)
+        logger.info(
+            f"Compiled {name} ({backend}) for batch sizes {compiled[name].batch_sizes} "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+    return compiled
+
+
+def save_compiled(predictor: CompiledPredictor, directory: str, name: str):
+    """
+    Save TorchScript variants of a compiled predictor for offline compilation.
+
+    Files are written as {directory}/{name}_b{batch_size}.pt.
+    """
+    if predictor.backend != 'trace':
+        raise ValueError("Only TorchScript ('trace') variants can be saved")
+
+    os.makedirs(directory, exist_ok=True)
+    for batch_size, module in predictor.compiled.items():
+        path = os.path.join(directory, f"{name}_b{batch_size}.pt")
+        torch.jit.save(module, path)
+        logger.info(f"Saved compiled {name} (batch size {batch_size}) to {path}")
+
+
+def load_compiled(
+    model: TransformerPredictor,
+    directory: str,
+    name: str,
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    warmup_iters: int = 3
+) -> CompiledPredictor:
+    """
+    Load TorchScript variants saved by `save_compiled`.
+
+    Missing or unloadable variants fall back to the eager model.
+    """
+    compiled = {}
+    for batch_size in batch_sizes:
+        path = os.path.join(directory, f"{name}_b{batch_size}.pt")
+        if not os.path.exists(path):
+            continue
+        try:
+            compiled[batch_size] = torch.jit.load(path, map_location=model.device)
+        except Exception as e:
+            logger.warning(f"Failed to load compiled {name} from {path}: {str(e)}")
+
+    predictor = CompiledPredictor(model, compiled, 'trace')
+    warm_up(predictor, batch_sizes, warmup_iters)
+    return predictor
+
+
+def _latency_percentiles(fn: Callable, x: torch.Tensor, n_runs: int) -> Dict[str, float]:
+    """p50/p99 latency of fn(x) in milliseconds."""
+    timings = []
+    with torch.no_grad():
+        fn(x)
+        for _ in range(n_runs):
+            start = time.perf_counter()
+            fn(x)
+            timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p99_ms': float(np.percentile(timings, 99)),
+    }
+
+
+def benchmark_compiled(
+    predictor: CompiledPredictor,
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    n_runs: int = 200
+) -> Dict[int, Dict]:
+    """
+    Compare eager and compiled forward latency.
+
+    Returns:
+        Dictionary mapping batch size to eager/compiled p50 and p99 latency
+        and the maximum absolute output difference
+    """
+    report = {}
+    for batch_size in batch_sizes:
+        x = _example_input(predictor.model, batch_size)
+
+        with torch.no_grad():
+            eager_out = predictor.model(x)
+            compiled_out = predictor.forward(x)
+        max_diff = max(
+            (a - b).abs().max().item() for a, b in zip(eager_out, compiled_out)
+        )
+
+        report[batch_size] = {
+            'compiled': batch_size in predictor.compiled,
+            'eager': _latency_percentiles(predictor.model, x, n_runs),
+            'compiled_latency': _latency_percentiles(predictor.forward, x, n_runs),
+            'max_abs_diff': max_diff,
+        }
+
+    return report
+
+
+if __name__ == '__main__':
+    # Benchmark eager vs TorchScript serving for the ensemble
+    logging.basicConfig(level=logging.INFO)
+
+    ensemble = create_ensemble(n_features=94, seq_len=60)
+    compiled = compile_ensemble(ensemble, backend='trace')
+
+    print(f"\n{'='*72}")
+    print("Eager vs Compiled Latency (ms)")
+    print(f"{'='*72}")
+    for name, predictor in compiled.items():
+        report = benchmark_compiled(predictor, n_runs=100)
+        for batch_size, stats in report.items():
+            print(f"{name} b={batch_size:<3} "
+                  f"eager p50={stats['eager']['p50_ms']:6.2f} p99={stats['eager']['p99_ms']:6.2f}  "
+                  f"compiled p50={stats['compiled_latency']['p50_ms']:6.2f} "
+                  f"p99={stats['compiled_latency']['p99_ms']:6.2f}  "
+                  f"diff={stats['max_abs_diff']:.1e}")
+
+    print(f"\n{'='*72}")
+    print("✅ Compiled serving benchmark complete!")
@@ -20,6 +20,9 @@ from dataclasses import dataclass
 from enum import Enum
 import logging
 
+from models.precision import autocast
+from models.weights import load_weights, save_weights
+
 
 class MarketRegime(Enum):
     """Market regime types."""
@@ -48,6 +51,9 @@ class GAFConfig:
     learning_rate: float = 1e-3
     weight_decay: float = 1e-4
     
+    # Inference
+    precision: str = 'fp32'         # 'fp32', 'bf16' or 'auto' (see models/precision.py)
+    
     def __post_init__(self):
         if self.n_channels is None:
             self.n_channels = [32, 64, 128]
@@ -264,8 +270,9 @@ class GAFConvNet(nn.Module):
         """
         self.eval()
         with torch.no_grad():
-            logits = self.forward(x)
-            probs = F.softmax(logits, dim=1)
+            with autocast(self.config.precision, x.device):
+                logits = self.forward(x)
+            probs = F.softmax(logits.float(), dim=1)
             
             confidence, pred_idx = torch.max(probs, dim=1)
             
@@ -290,8 +297,8 @@ class GAFRegimeClassifier:
     
     def __init__(self, config: Optional[GAFConfig] = None):
         self.config = config or GAFConfig()
-        self.transformer = GAFTransformer(config)
-        self.model = GAFConvNet(config)
+        self.transformer = GAFTransformer(self.config)
+        self.model = GAFConvNet(self.config)
         self.logger = logging.getLogger(__name__)
         
         # Move model to GPU if available
@@ -361,8 +368,9 @@ class GAFRegimeClassifier:
         # Classify
         self.model.eval()
         with torch.no_grad():
-            logits = self.model(gaf_tensor)
-            probs = F.softmax(logits, dim=1)
+            with autocast(self.config.precision, self.device):
+                logits = self.model(gaf_tensor)
+            probs = F.softmax(logits.float(), dim=1)
         
         # Convert to results
         results = []
@@ -449,13 +457,18 @@ class GAFRegimeClassifier:
         return loss.item(), accuracy.item()
     
     def save_model(self, path: str):
-        """Save model weights."""
-        torch.save(self.model.state_dict(), path)
+        """Save model weights (.safetensors or .pth, by extension)."""
+        save_weights(self.model, path)
         self.logger.info(f"Model saved to {path}")
     
     def load_model(self, path: str):
-        """Load model weights."""
-        self.model.load_state_dict(torch.load(path, map_location=self.device))
+        """
+        Load model weights.
+        
+        .safetensors files are memory-mapped and shared zero-copy on CPU;
+        legacy .pth state dicts are also accepted.
+        """
+        load_weights(self.model, path, self.device)
         self.logger.info(f"Model loaded from {path}")
 
 
@@ -0,0 +1,313 @@
+"""
+Sliding-Window Incremental Inference for the Transformer Ensemble
+
+Live scoring shifts each symbol's 60-bar window by one bar at a time, yet
+`TransformerPredictor.predict` re-projects the whole window on every call.
+A `TransformerSession` keeps per-symbol state so that each new bar only
+pays for what it actually changes:
+
+- input_projection is applied to the new feature row only; projected rows
+  are kept in a ring buffer
+- the first encoder layer's query/key/value projections are linear, so
+  W(p_t + pe_i) = W p_t + W pe_i. The row term W p_t is cached per bar and
+  the position term W pe_i is precomputed once, which keeps the cache valid
+  even though every cached row moves to a new position when the window
+  slides
+- attention and everything after it are recomputed, since every position
+  attends to the new bar (the final layer uses the last-token path)
+
+The cached projections are of the un-normalized rows, so sessions need
+post-norm encoder layers (norm_first=False, as TransformerPredictor builds
+them). Results match `TransformerPredictor.predict` on the same window to
+fp32 rounding, and nothing accumulates across steps. Dynamic int8 models pick
+activation scales per call, so for those the match is only to within
+quantization error.
+
+Usage:
+    session = TransformerSession(model)
+    for row in live_feature_rows:
+        prediction = session.step(row)   # None until seq_len bars are seen
+"""
+
+import time
+import torch
+import torch.nn.functional as F
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+import logging
+
+from models.transformer import TransformerPredictor, create_ensemble
+
+logger = logging.getLogger(__name__)
+
+FeatureRow = Union[np.ndarray, torch.Tensor]
+
+
+class TransformerSession:
+    """
+    Per-symbol incremental inference state for one TransformerPredictor.
+
+    Projected rows are stored twice in a buffer of length 2 * seq_len so
+    that the current window is always a contiguous, chronologically ordered
+    view and never needs to be gathered or rolled.
+    """
+
+    def __init__(self, model: TransformerPredictor):
+        model.eval()
+        self.model = model
+        self.seq_len = model.config.seq_len
+        self.device = model.device
+
+        first_layer = model.transformer_encoder.layers[0]
+        if first_layer.norm_first:
+            raise ValueError("TransformerSession requires post-norm encoder layers (norm_first=False)")
+        attn = first_layer.self_attn
+        d_model = model.config.d_model
+
+        with torch.no_grad():
+            pe = model.pos_encoder.pe[0, :self.seq_len].to(self.device)
+            self._pe = pe                                                  # (seq_len, d_model)
+            self._pe_qkv = F.linear(pe, attn.in_proj_weight)               # (seq_len, 3 * d_model)
+
+        self._rows = torch.zeros(2 * self.seq_len, d_model, device=self.device)
+        self._row_qkv = torch.zeros(2 * self.seq_len, 3 * d_model, device=self.device)
+        self._head = 0
+        self._count = 0
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether a full window has been observed."""
+        return self._count >= self.seq_len
+
+    def reset(self):
+        """Forget all observed bars."""
+        self._head = 0
+        self._count = 0
+
+    def prime(self, history: FeatureRow) -> Optional[Dict[str, float]]:
+        """
+        Seed the session with a block of historical feature rows.
+
+        Args:
+            history: Array of shape (n_bars, n_features), oldest first
+
+        Returns:
+            Prediction for the last window, or None if fewer than seq_len
+            bars have been observed
+        """
+        history = self._as_tensor(history)
+        with torch.no_grad():
+            for row in history[-self.seq_len:]:
+                self._push(row)
+        return self._predict() if self.is_ready else None
+
+    def step(self, new_feature_row: FeatureRow) -> Optional[Dict[str, float]]:
+        """
+        Append one bar and score the updated window.
+
+        Args:
+            new_feature_row: Feature vector of shape (n_features,)
+
+        Returns:
+            Dictionary with 'return', 'volatility' and 'confidence', or None
+            until seq_len bars have been observed
+        """
+        row = self._as_tensor(new_feature_row).reshape(-1)
+        with torch.no_grad():
+            self._push(row)
+            if not self.is_ready:
+                return None
+            return self._predict()
+
+    def _as_tensor(self, data: FeatureRow) -> torch.Tensor:
+        if isinstance(data, np.ndarray):
+            data = torch.from_numpy(data)
+        return data.to(device=self.device, dtype=torch.float32)
+
+    def _push(self, row: torch.Tensor):
+        """Project a single row and write it into both halves of the ring."""
+        attn = self.model.transformer_encoder.layers[0].self_attn
+
+        projected = self.model.input_projection(row.unsqueeze(0))[0]
+        qkv = F.linear(projected, attn.in_proj_weight, attn.in_proj_bias)
+
+        slot = self._head
+        self._rows[slot] = projected
+        self._rows[slot + self.seq_len] = projected
+        self._row_qkv[slot] = qkv
+        self._row_qkv[slot + self.seq_len] = qkv
+
+        self._head = (self._head + 1) % self.seq_len
+        self._count += 1
+
+    def _predict(self) -> Dict[str, float]:
+        """Score the current window from the cached projections."""
+        model = self.model
+        layers = model.transformer_encoder.layers
+        window = slice(self._head, self._head + self.seq_len)
+
+        # Position-encoded sequence and first-layer Q/K/V for the window
+        x = (self._rows[window] + self._pe).unsqueeze(0)       # (1, seq_len, d_model)
+        qkv = self._row_qkv[window] + self._pe_qkv             # (seq_len, 3 * d_model)
+
+        single_layer = len(layers) == 1
+        x = self._first_layer_forward(layers[0], x, qkv, last_token_only=single_layer)
+
+        if single_layer:
+            x = x[:, -1, :]
+        else:
+            for layer in layers[1:-1]:
+                x = layer(x) if model.fused_encoder else model._layer_forward(layer, x)
+            x = model._last_token_layer_forward(layers[-1], x)
+
+        x = model.layer_norm(x)
+
+        return {
+            'return': model.return_head(x).item(),
+            'volatility': model.volatility_head(x).item(),
+            'confidence': model.confidence_head(x).item(),
+        }
+
+    def _first_layer_forward(
+        self,
+        layer: torch.nn.TransformerEncoderLayer,
+        x: torch.Tensor,
+        qkv: torch.Tensor,
+        last_token_only: bool
+    ) -> torch.Tensor:
+        """Post-norm encoder layer using precomputed Q/K/V projections."""
+        attn = layer.self_attn
+        n_heads = attn.num_heads
+        d_model = x.size(-1)
+        head_dim = d_model // n_heads
+
+        q, k, v = qkv.split(d_model, dim=-1)
+        if last_token_only:
+            q = q[-1:]
+            x = x[:, -1:, :]
+
+        def split_heads(t: torch.Tensor) -> torch.Tensor:
+            return t.reshape(1, -1, n_heads, head_dim).transpose(1, 2)
+
+        out = F.scaled_dot_product_attention(split_heads(q), split_heads(k), split_heads(v))
+        out = out.transpose(1, 2).reshape(1, -1, d_model)
+        out = attn.out_proj(out)
+
+        h = layer.norm1(x + layer.dropout1(out))
+        h = layer.norm2(h + TransformerPredictor._feed_forward(layer, h))
+        return h
+
+
+class EnsembleSession:
+    """Incremental inference state for one symbol across the whole ensemble."""
+
+    def __init__(self, ensemble: Dict[str, TransformerPredictor]):
+        self.sessions = {name: TransformerSession(model) for name, model in ensemble.items()}
+
+    @property
+    def is_ready(self) -> bool:
+        return all(session.is_ready for session in self.sessions.values())
+
+    def reset(self):
+        for session in self.sessions.values():
+            session.reset()
+
+    def prime(self, history: FeatureRow) -> Optional[Dict[str, Dict[str, float]]]:
+        """Seed every model's session with historical rows."""
+        predictions = {name: session.prime(history) for name, session in self.sessions.items()}
+        return predictions if self.is_ready else None
+
+    def step(self, new_feature_row: FeatureRow) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        Append one bar and score it with every model.
+
+        Returns:
+            Dictionary mapping model names to predictions, or None until a
+            full window has been observed
+        """
+        predictions = {
+            name: session.step(new_feature_row) for name, session in self.sessions.items()
+        }
+        return predictions if self.is_ready else None
+
+
+class SessionPool:
+    """
+    Per-symbol EnsembleSession cache with least-recently-used eviction.
+
+    Bounds memory when scoring a large, changing symbol universe: each
+    session holds two ring buffers per model.
+    """
+
+    def __init__(self, ensemble: Dict[str, TransformerPredictor], max_symbols: int = 10000):
+        self.ensemble = ensemble
+        self.max_symbols = max_symbols
+        self._sessions: 'OrderedDict[str, EnsembleSession]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._sessions
+
+    def get(self, symbol: str) -> EnsembleSession:
+        """Return the session for a symbol, creating it if needed."""
+        session = self._sessions.get(symbol)
+        if session is None:
+            session = EnsembleSession(self.ensemble)
+            self._sessions[symbol] = session
+            if len(self._sessions) > self.max_symbols:
+                evicted, _ = self._sessions.popitem(last=False)
+                logger.debug(f"Evicted inference session for {evicted}")
+        else:
+            self._sessions.move_to_end(symbol)
+        return session
+
+    def step(self, symbol: str, new_feature_row: FeatureRow) -> Optional[Dict[str, Dict[str, float]]]:
+        """Append one bar for a symbol and score it with every model."""
+        return self.get(symbol).step(new_feature_row)
+
+    def drop(self, symbol: str):
+        """Discard a symbol's session."""
+        self._sessions.pop(symbol, None)
+
+
+if __name__ == '__main__':
+    # Compare incremental per-bar scoring against full-window predict()
+    logging.basicConfig(level=logging.INFO)
+
+    ensemble = create_ensemble(n_features=94, seq_len=60)
+    bars = torch.randn(160, 94)
+
+    session = EnsembleSession(ensemble)
+    session.prime(bars[:60])
+
+    max_error = 0.0
+    session_time = 0.0
+    predict_time = 0.0
+
+    for t in range(60, len(bars)):
+        start = time.perf_counter()
+        incremental = session.step(bars[t])
+        session_time += time.perf_counter() - start
+
+        window = bars[t - 59:t + 1]
+        start = time.perf_counter()
+        full = {name: model.predict(window) for name, model in ensemble.items()}
+        predict_time += time.perf_counter() - start
+
+        for name in ensemble:
+            for key in ('return', 'volatility', 'confidence'):
+                max_error = max(max_error, abs(incremental[name][key] - full[name][key][0]))
+
+    n_steps = len(bars) - 60
+    print(f"\n{'='*60}")
+    print("Incremental Inference Benchmark")
+    print(f"{'='*60}")
+    print(f"Max abs error vs predict(): {max_error:.2e}")
+    print(f"Per-bar ensemble latency:   {predict_time / n_steps * 1000:.2f}ms (predict) -> "
+          f"{session_time / n_steps * 1000:.2f}ms (session)")
+
+    print(f"\n{'='*60}")
+    print("✅ Incremental inference test complete!")
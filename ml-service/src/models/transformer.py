@@ -24,10 +24,13 @@ import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
 import math
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 
+from models.precision import autocast
+from models.weights import load_weights, save_weights
+
 logger = logging.getLogger(__name__)
 
 
@@ -63,6 +66,10 @@ class TransformerConfig:
     weight_decay: float = 1e-5
     warmup_steps: int = 1000
 
+    # Inference
+    last_token_inference: bool = True   # Final encoder layer computes only the last position
+    precision: str = 'fp32'             # 'fp32', 'bf16' or 'auto' (see models/precision.py)
+
 
 class PositionalEncoding(nn.Module):
     """
@@ -171,6 +178,11 @@ class TransformerPredictor(nn.Module):
 
         self._init_weights()
 
+        # nn.TransformerEncoder's fused inference kernel reads raw Linear
+        # weights, so it must be bypassed once layers are swapped for
+        # quantized (or otherwise non-standard) modules.
+        self.fused_encoder = True
+
         # Move to GPU if available
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.to(self.device)
@@ -208,12 +220,10 @@ class TransformerPredictor(nn.Module):
         # Add positional encoding
         x = self.pos_encoder(x)
 
-        # Transformer encoder
-        x = self.transformer_encoder(x)  # (batch, seq_len, d_model)
-
-        # Use the last time step's representation for prediction
-        # (similar to using [CLS] token in BERT)
-        x = x[:, -1, :]  # (batch, d_model)
+        # Transformer encoder, keeping only the last time step's
+        # representation for prediction (similar to [CLS] token in BERT)
+        last_token_only = self.config.last_token_inference and not self.training
+        x = self._encode(x, last_token_only=last_token_only)  # (batch, d_model)
         x = self.layer_norm(x)
 
         # Compute outputs
@@ -223,6 +233,71 @@ class TransformerPredictor(nn.Module):
 
         return predicted_return, predicted_volatility, confidence
 
+    def _encode(self, x: torch.Tensor, last_token_only: bool = False) -> torch.Tensor:
+        """
+        Run the encoder stack and return the last position's representation.
+
+        Only the final position feeds the output heads, so with
+        last_token_only the final layer computes its attention query,
+        residuals and feed-forward for that position alone. Keys and values
+        still cover the whole sequence, so the result is unchanged.
+
+        Args:
+            x: Position-encoded input of shape (batch_size, seq_len, d_model)
+            last_token_only: Use the last-position fast path (inference only)
+
+        Returns:
+            Tensor of shape (batch_size, d_model)
+        """
+        layers = self.transformer_encoder.layers
+
+        if not last_token_only:
+            if self.fused_encoder:
+                x = self.transformer_encoder(x)
+            else:
+                for layer in layers:
+                    x = self._layer_forward(layer, x)
+            return x[:, -1, :]
+
+        for layer in layers[:-1]:
+            x = layer(x) if self.fused_encoder else self._layer_forward(layer, x)
+
+        return self._last_token_layer_forward(layers[-1], x)
+
+    @staticmethod
+    def _feed_forward(layer: nn.TransformerEncoderLayer, x: torch.Tensor) -> torch.Tensor:
+        """Feed-forward sublayer (before the residual add) from the layer's public modules."""
+        return layer.dropout2(layer.linear2(layer.dropout(layer.activation(layer.linear1(x)))))
+
+    @staticmethod
+    def _layer_forward(layer: nn.TransformerEncoderLayer, x: torch.Tensor) -> torch.Tensor:
+        """Encoder layer (pre- or post-norm) without the fused kernel."""
+        return TransformerPredictor._partial_layer_forward(layer, x, x)
+
+    @staticmethod
+    def _last_token_layer_forward(layer: nn.TransformerEncoderLayer, x: torch.Tensor) -> torch.Tensor:
+        """Encoder layer (pre- or post-norm) evaluated for the final position only."""
+        return TransformerPredictor._partial_layer_forward(layer, x, x[:, -1:, :])[:, 0, :]
+
+    @staticmethod
+    def _partial_layer_forward(layer: nn.TransformerEncoderLayer, x: torch.Tensor,
+                               query: torch.Tensor) -> torch.Tensor:
+        """
+        Encoder layer outputs at the query positions, attending over all of x.
+
+        Built from the layer's submodules rather than its private block
+        methods, following nn.TransformerEncoderLayer.forward for both
+        norm_first settings (no masks).
+        """
+        if layer.norm_first:
+            kv = layer.norm1(x)
+            q = kv if query is x else layer.norm1(query)
+            h = query + layer.dropout1(layer.self_attn(q, kv, kv, need_weights=False)[0])
+            return h + TransformerPredictor._feed_forward(layer, layer.norm2(h))
+
+        h = layer.norm1(query + layer.dropout1(layer.self_attn(query, x, x, need_weights=False)[0]))
+        return layer.norm2(h + TransformerPredictor._feed_forward(layer, h))
+
     def predict(self, features: torch.Tensor) -> Dict[str, float]:
         """
         Make a prediction and return structured results.
@@ -242,33 +317,118 @@ class TransformerPredictor(nn.Module):
 
         features = features.to(self.device)
 
-        with torch.no_grad():
+        with torch.no_grad(), autocast(self.config.precision, self.device):
             pred_return, pred_vol, pred_conf = self.forward(features)
 
         return {
-            'return': pred_return.squeeze(-1).cpu().numpy().tolist(),
-            'volatility': pred_vol.squeeze(-1).cpu().numpy().tolist(),
-            'confidence': pred_conf.squeeze(-1).cpu().numpy().tolist()
+            'return': pred_return.squeeze(-1).float().cpu().numpy().tolist(),
+            'volatility': pred_vol.squeeze(-1).float().cpu().numpy().tolist(),
+            'confidence': pred_conf.squeeze(-1).float().cpu().numpy().tolist()
         }
 
     def load_model(self, path: str):
-        """Load pre-trained model weights."""
-        state_dict = torch.load(path, map_location=self.device)
-        self.load_state_dict(state_dict)
+        """
+        Load pre-trained model weights.
+
+        .safetensors files are memory-mapped and shared zero-copy on CPU;
+        legacy .pth state dicts are also accepted.
+        """
+        load_weights(self, path, self.device)
         logger.info(f"Loaded model weights from {path}")
 
     def save_model(self, path: str):
-        """Save model weights."""
-        torch.save(self.state_dict(), path)
+        """Save model weights (.safetensors or .pth, by extension)."""
+        save_weights(self, path)
         logger.info(f"Saved model weights to {path}")
 
 
-def create_ensemble(
+def blend_predictions(
+    outputs: List[Tuple[torch.Tensor, torch.Tensor, torch.Tensor]]
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Blend ensemble member outputs (confidence-weighted).
+
+    Return and volatility are averaged with weights proportional to each
+    member's confidence; confidence is the plain average. This is the one
+    implementation of the blend: the server's Predict, distillation
+    targets and the quantization drift report all call it.
+
+    Args:
+        outputs: List of (return, volatility, confidence) tuples, one per
+                 model, each of shape (batch_size, 1)
+
+    Returns:
+        Blended (return, volatility, confidence), each (batch_size, 1)
+    """
+    returns = torch.stack([o[0] for o in outputs])
+    volatilities = torch.stack([o[1] for o in outputs])
+    confidences = torch.stack([o[2] for o in outputs])
+
+    weights = confidences / confidences.sum(dim=0, keepdim=True)
+
+    return (
+        (returns * weights).sum(dim=0),
+        (volatilities * weights).sum(dim=0),
+        confidences.mean(dim=0),
+    )
+
+
+def estimate_flops(config: TransformerConfig) -> Dict[str, float]:
+    """
+    Estimate forward-pass FLOPs for one input window.
+
+    Counts multiply-adds (2 FLOPs each) in the Linear layers and attention
+    products; normalization, activations and softmax are ignored.
+
+    Args:
+        config: Model configuration
+
+    Returns:
+        Dictionary with 'full' and 'last_token' FLOPs per window and the
+        relative 'savings' of the last-token fast path
+    """
+    L = config.seq_len
+    d = config.d_model
+
+    input_projection = 2 * L * config.n_features * d
+    heads = 3 * (2 * d * (d // 2) + 2 * (d // 2))
+
+    # Full encoder layer: QKV projection, scores, weighted values,
+    # output projection and feed-forward for every position
+    full_layer = (
+        2 * L * d * 3 * d +
+        2 * 2 * L * L * d +
+        2 * L * d * d +
+        2 * 2 * L * d * config.d_ff
+    )
+
+    # Final layer on the last-token path: keys/values for every position,
+    # everything else for a single query
+    last_layer = (
+        2 * L * d * 2 * d + 2 * d * d +
+        2 * 2 * L * d +
+        2 * d * d +
+        2 * 2 * d * config.d_ff
+    )
+
+    full = input_projection + config.n_encoder_layers * full_layer + heads
+    last_token = (
+        input_projection + (config.n_encoder_layers - 1) * full_layer + last_layer + heads
+    )
+
+    return {
+        'full': float(full),
+        'last_token': float(last_token),
+        'savings': 1.0 - last_token / full,
+    }
+
+
+def ensemble_configs(
     n_features: int = 94,
     seq_len: int = 60
-) -> Dict[str, TransformerPredictor]:
+) -> Dict[str, TransformerConfig]:
     """
-    Create the NN1-NN5 Transformer ensemble.
+    Hyperparameters of the NN1-NN5 Transformer ensemble.
 
     Each model in the ensemble has different hyperparameters to capture
     different aspects of market dynamics:
@@ -284,9 +444,9 @@ def create_ensemble(
         seq_len: Sequence length / lookback window (default: 60)
 
     Returns:
-        Dictionary mapping model names to TransformerPredictor instances
+        Dictionary mapping model names to TransformerConfig instances
     """
-    configs = {
+    return {
         'NN1': TransformerConfig(
             n_features=n_features,
             seq_len=seq_len,
@@ -339,11 +499,69 @@ def create_ensemble(
         ),
     }
 
+
+def create_ensemble(
+    n_features: int = 94,
+    seq_len: int = 60
+) -> Dict[str, TransformerPredictor]:
+    """
+    Create the NN1-NN5 Transformer ensemble (see ensemble_configs).
+
+    Args:
+        n_features: Number of input features (default: 94)
+        seq_len: Sequence length / lookback window (default: 60)
+
+    Returns:
+        Dictionary mapping model names to TransformerPredictor instances
+    """
     ensemble = {}
-    for name, config in configs.items():
+    for name, config in ensemble_configs(n_features, seq_len).items():
         logger.info(f"Creating {name}: d_model={config.d_model}, "
                      f"n_heads={config.n_heads}, n_layers={config.n_encoder_layers}")
         ensemble[name] = TransformerPredictor(config)
 
     logger.info(f"Ensemble created with {len(ensemble)} models")
     return ensemble
+
+
+if __name__ == '__main__':
+    # Report per-model FLOP savings of the last-token inference fast path
+    logging.basicConfig(level=logging.INFO)
+
+    ensemble = create_ensemble()
+
+    # The unfused and last-token layer paths must match the full forward
+    # (post-norm as configured, and pre-norm layers)
+    torch.manual_seed(0)
+    x = torch.randn(4, 60, 128)
+    max_error = 0.0
+    for norm_first in (False, True):
+        layer = nn.TransformerEncoderLayer(128, 4, 256, dropout=0.1, batch_first=True,
+                                           activation='gelu', norm_first=norm_first).eval()
+        with torch.no_grad():
+            reference = layer(x)
+            unfused = TransformerPredictor._layer_forward(layer, x)
+            last = TransformerPredictor._last_token_layer_forward(layer, x)
+        max_error = max(max_error, (unfused - reference).abs().max().item(),
+                        (last - reference[:, -1, :]).abs().max().item())
+
+    model = ensemble['NN1'].eval()
+    window = torch.randn(8, model.config.seq_len, model.config.n_features, device=model.device)
+    with torch.no_grad():
+        full = model.layer_norm(model._encode(model.pos_encoder(model.input_projection(window))))
+        fast = model.layer_norm(model._encode(model.pos_encoder(model.input_projection(window)),
+                                              last_token_only=True))
+    max_error = max(max_error, (fast - full).abs().max().item())
+
+    print(f"\n{'='*60}")
+    print("Last-Token Fast Path FLOPs per Window")
+    print(f"{'='*60}")
+    for name, model in ensemble.items():
+        flops = estimate_flops(model.config)
+        print(f"{name}: {flops['full']/1e6:8.1f} MFLOPs -> {flops['last_token']/1e6:8.1f} MFLOPs "
+              f"({flops['savings']:.1%} saved)")
+
+    print(f"Max abs error of the layer paths vs the full forward: {max_error:.2e}")
+
+    print(f"\n{'='*60}")
+    print("✅ Transformer FLOP report complete!")
@@ -0,0 +1,299 @@
+"""
+Memory-Mapped Model Weight Storage
+
+`torch.load` on a pickled state dict deserializes a private copy of every
+tensor in every worker process. Weights stored as safetensors can instead
+be memory-mapped and handed to the module without copying:
+
+- the file is mapped copy-on-write (MAP_PRIVATE), so all server processes
+  on a host share the same page-cache pages until one of them writes
+- tensors are views into the mapping, created with torch.frombuffer, and
+  are installed into the module with load_state_dict(assign=True)
+- pages are faulted in lazily on first use, so startup cost no longer
+  scales with model size
+
+Legacy .pth checkpoints are still accepted and loaded with
+torch.load(mmap=True); `convert_checkpoint` migrates them to safetensors.
+
+Format reference: https://github.com/huggingface/safetensors
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import time
+import torch
+import torch.nn as nn
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+SAFETENSORS_EXT = '.safetensors'
+LEGACY_EXT = '.pth'
+
+_SAFETENSORS_DTYPES = {
+    'F64': torch.float64,
+    'F32': torch.float32,
+    'F16': torch.float16,
+    'BF16': torch.bfloat16,
+    'I64': torch.int64,
+    'I32': torch.int32,
+    'I16': torch.int16,
+    'I8': torch.int8,
+    'U8': torch.uint8,
+    'BOOL': torch.bool,
+}
+
+
+def is_safetensors(path: str) -> bool:
+    return path.endswith(SAFETENSORS_EXT)
+
+
+def resolve_weights(directory: str, name: str) -> Optional[str]:
+    """
+    Find the weights file for a model, preferring safetensors over .pth.
+
+    Args:
+        directory: Directory holding weight files
+        name: File stem, e.g. "NN1" or "gaf"
+
+    Returns:
+        Path to the weights file, or None if neither format exists
+    """
+    for ext in (SAFETENSORS_EXT, LEGACY_EXT):
+        path = os.path.join(directory, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _read_safetensors_header(f, path: str, file_size: int):
+    """Parse and validate a safetensors header; returns (entries, data_start)."""
+    if file_size < 8:
+        raise ValueError(f"{path}: too short for a safetensors header")
+    header_size = struct.unpack('<Q', f.read(8))[0]
+    if header_size > file_size - 8:
+        raise ValueError(f"{path}: header size {header_size} exceeds the file size {file_size}")
+    try:
+        header = json.loads(f.read(header_size))
+    except ValueError as e:
+        raise ValueError(f"{path}: invalid safetensors header: {e}") from None
+    if not isinstance(header, dict):
+        raise ValueError(f"{path}: safetensors header is not a JSON object")
+    header.pop('__metadata__', None)
+
+    data_start = 8 + header_size
+    data_size = file_size - data_start
+    entries = []
+    for name, info in header.items():
+        dtype = _SAFETENSORS_DTYPES.get(info.get('dtype'))
+        if dtype is None:
+            raise ValueError(f"{path}: unsupported safetensors dtype {info.get('dtype')} for {name}")
+        shape = info.get('shape')
+        offsets = info.get('data_offsets')
+        if (not isinstance(shape, list) or not all(isinstance(d, int) and d >= 0 for d in shape)
+                or not isinstance(offsets, list) or len(offsets) != 2
+                or not all(isinstance(o, int) for o in offsets)):
+            raise ValueError(f"{path}: malformed shape or data_offsets for tensor {name}")
+
+        begin, end = offsets
+        element_size = torch.empty((), dtype=dtype).element_size()
+        expected = math.prod(shape) * element_size
+        if not 0 <= begin <= end <= data_size:
+            raise ValueError(f"{path}: data_offsets {offsets} of tensor {name} fall outside "
+                             f"the {data_size}-byte data section")
+        if end - begin != expected:
+            raise ValueError(f"{path}: tensor {name} has {end - begin} bytes of data, expected "
+                             f"{expected} for {info['dtype']} {shape}")
+        if (data_start + begin) % element_size != 0:
+            raise ValueError(f"{path}: tensor {name} is not aligned to its {element_size}-byte dtype")
+        entries.append((begin, end, name, dtype, shape))
+
+    entries.sort()
+    for (_, previous_end, previous, _, _), (begin, _, name, _, _) in zip(entries, entries[1:]):
+        if begin < previous_end:
+            raise ValueError(f"{path}: data of tensors {previous} and {name} overlap")
+
+    return entries, data_start
+
+
+def mmap_safetensors(path: str) -> Dict[str, torch.Tensor]:
+    """
+    Map a safetensors file into memory and return zero-copy CPU tensors.
+
+    The mapping is copy-on-write: pages are shared with every other process
+    mapping the same file until a tensor is modified in place.
+
+    Args:
+        path: Path to a .safetensors file
+
+    Returns:
+        State dict whose tensors are views into the mapping
+
+    Raises:
+        ValueError: If the header is malformed or a tensor's offsets do not
+                    match its shape and dtype, lie outside the file, are
+                    misaligned or overlap another tensor
+    """
+    # The format is read here rather than with safetensors.safe_open so the
+    # sharing contract is explicit: one MAP_PRIVATE mapping of the file,
+    # tensors as frombuffer views of it, independent of how a given
+    # library version materializes tensors. The header is validated with
+    # the library's rules before any view is created.
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        entries, data_start = _read_safetensors_header(f, path, file_size)
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    state_dict = {}
+    for begin, end, name, dtype, shape in entries:
+        if begin == end:
+            state_dict[name] = torch.empty(shape, dtype=dtype)
+            continue
+
+        count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+        tensor = torch.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + begin)
+        state_dict[name] = tensor.reshape(shape)
+
+    return state_dict
+
+
+def load_state_dict(path: str, device: torch.device) -> Dict[str, torch.Tensor]:
+    """
+    Load a state dict from safetensors (memory-mapped) or legacy .pth.
+
+    Args:
+        path: Weights file
+        device: Target device; anything other than CPU implies a copy
+
+    Returns:
+        State dict on the target device
+    """
+    if is_safetensors(path):
+        state_dict = mmap_safetensors(path)
+    else:
+        state_dict = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+
+    if device.type != 'cpu':
+        state_dict = {name: tensor.to(device) for name, tensor in state_dict.items()}
+
+    return state_dict
+
+
+def load_weights(module: nn.Module, path: str, device: Optional[torch.device] = None):
+    """
+    Load weights into a module, zero-copy on CPU.
+
+    On CPU the module's parameters and buffers are replaced by the mapped
+    tensors (assign=True) rather than copied into its existing storage.
+
+    Args:
+        module: Module to load into
+        path: .safetensors or .pth weights file
+        device: Device the module lives on (defaults to its first parameter's)
+    """
+    if device is None:
+        device = next(module.parameters()).device
+
+    state_dict = load_state_dict(path, device)
+    module.load_state_dict(state_dict, assign=device.type == 'cpu')
+
+
+def save_weights(module: nn.Module, path: str):
+    """
+    Save a module's weights; the format follows the file extension.
+
+    Args:
+        module: Module to save
+        path: Destination, .safetensors or .pth
+    """
+    state_dict = {
+        name: tensor.detach().cpu().contiguous()
+        for name, tensor in module.state_dict().items()
+    }
+
+    if is_safetensors(path):
+        from safetensors.torch import save_file
+        save_file(state_dict, path)
+    else:
+        torch.save(state_dict, path)
+
+
+def convert_checkpoint(src_path: str, dst_path: Optional[str] = None) -> str:
+    """
+    Convert a pickled .pth state dict into safetensors.
+
+    Args:
+        src_path: Existing .pth checkpoint
+        dst_path: Output path (defaults to src_path with .safetensors)
+
+    Returns:
+        Path of the written safetensors file
+    """
+    from safetensors.torch import save_file
+
+    if dst_path is None:
+        dst_path = os.path.splitext(src_path)[0] + SAFETENSORS_EXT
+
+    state_dict = torch.load(src_path, map_location='cpu', weights_only=True)
+    save_file({name: tensor.contiguous() for name, tensor in state_dict.items()}, dst_path)
+    logger.info(f"Converted {src_path} -> {dst_path}")
+
+    return dst_path
+
+
+def convert_directory(directory: str) -> int:
+    """Convert every .pth checkpoint in a directory; returns the number converted."""
+    converted = 0
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(LEGACY_EXT):
+            convert_checkpoint(os.path.join(directory, filename))
+            converted += 1
+    return converted
+
+
+if __name__ == '__main__':
+    # Convert a weights directory, or benchmark load paths on a fresh model
+    import sys
+    import tempfile
+
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) > 1:
+        n = convert_directory(sys.argv[1])
+        print(f"✅ Converted {n} checkpoint(s) in {sys.argv[1]}")
+        sys.exit(0)
+
+    from models.transformer import TransformerPredictor, TransformerConfig
+
+    model = TransformerPredictor(TransformerConfig(d_model=256, d_ff=512, n_encoder_layers=4))
+    model.to('cpu')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pth_path = os.path.join(tmp, 'NN4.pth')
+        st_path = os.path.join(tmp, 'NN4.safetensors')
+        save_weights(model, pth_path)
+        convert_checkpoint(pth_path, st_path)
+
+        start = time.perf_counter()
+        model.load_state_dict(torch.load(pth_path, map_location='cpu'))
+        pickled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_weights(model, st_path, torch.device('cpu'))
+        mapped = time.perf_counter() - start
+
+        x = torch.randn(1, 60, 94)
+        model.predict(x)
+
+    print(f"\n{'='*60}")
+    print("Weight Loading Benchmark (NN4)")
+    print(f"{'='*60}")
+    print(f"torch.load (pickle):    {pickled * 1000:.2f}ms")
+    print(f"safetensors (mmap):     {mapped * 1000:.2f}ms")
+
+    print(f"\n{'='*60}")
+    print("✅ Weight loading test complete!")
@@ -13,8 +13,6 @@ References:
 - Loughran, T., & McDonald, B. (2011). When is a Liability not a Liability?
 """
 
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
@@ -22,6 +20,11 @@ import numpy as np
 from datetime import datetime
 import os
 
+from lazy_imports import lazy_import
+
+# Deferred until a SentimentAnalyzer is actually used
+torch = lazy_import('torch')
+
 logger = logging.getLogger(__name__)
 
 
@@ -71,6 +74,8 @@ class SentimentAnalyzer:
         self.logger = logging.getLogger(__name__)
         
         # Load BERT model
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        
         self.logger.info(f"Loading BERT model: {self.config.bert_model}")
         self.tokenizer = AutoTokenizer.from_pretrained(self.config.bert_model)
         self.model = AutoModelForSequenceClassification.from_pretrained(self.config.bert_model)
@@ -307,13 +312,13 @@ Text: {text}"""
             total_weight += source_weight
         
         if not weighted_scores:
-        return {
-            'compound': 0.0,
-            'confidence': 0.0,
-            'label': 'neutral',
-            'sources': [],
-            'total_mentions': 0
-        }
+            return {
+                'compound': 0.0,
+                'confidence': 0.0,
+                'label': 'neutral',
+                'sources': [],
+                'total_mentions': 0
+            }
         
         # Compute weighted average
         weighted_compound = sum(s['compound'] * s['weight'] for s in weighted_scores) / total_weight
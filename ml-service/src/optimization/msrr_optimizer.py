@@ -7,6 +7,13 @@ This module implements advanced portfolio optimization that:
 3. Accounts for realistic transaction costs
 4. Provides factor-based risk decomposition
 
+SLSQP is given the closed-form gradient of the objective (return,
+downside risk, and turnover costs with a smoothed L1 turnover) and the
+constraint Jacobians, so each iteration costs one covariance mat-vec
+instead of n_assets + 1 finite-difference evaluations. For universes of
+thousands of assets, `OptimizationConfig(solver='admm')` solves the same
+problem with ADMM on a low-rank plus diagonal covariance (see admm.py).
+
 References:
 - Markowitz, H. (1952). Portfolio Selection
 - Sortino, F. A., & Price, L. N. (1994). Performance Measurement in a Downside Risk Framework
@@ -19,8 +26,12 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 import logging
 
+from optimization.admm import downside_covariance_factors, solve_msrr_admm
+
 logger = logging.getLogger(__name__)
 
+SOLVERS = ('slsqp', 'admm')
+
 
 @dataclass
 class OptimizationConfig:
@@ -46,6 +57,9 @@ class OptimizationConfig:
     # Optimization
     max_iterations: int = 1000             # Maximum optimization iterations
     tolerance: float = 1e-6                # Convergence tolerance
+    turnover_smoothing: float = 1e-6       # |x| ~ sqrt(x^2 + eps^2) - eps in turnover costs
+    solver: str = 'slsqp'                  # 'slsqp', or 'admm' for large universes (see admm.py)
+    admm_max_iterations: int = 20000       # ADMM iterations per impact-linearization pass
     
     # Robustness
     use_robust_estimation: bool = True     # Use robust covariance estimation
@@ -84,11 +98,114 @@ class MSRROptimizer:
         Returns:
             Dictionary with optimal weights and diagnostics
         """
+        if self.config.solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {self.config.solver}")
+        
         n_samples, n_assets = returns.shape
         
         # Estimate expected returns (robust)
         expected_returns = self._estimate_returns(returns)
         
+        # Set up optimization problem
+        if current_weights is None:
+            current_weights = np.zeros(n_assets)
+        
+        # Initial guess (equal weights or current weights)
+        if np.sum(current_weights) > 0:
+            x0 = current_weights
+        else:
+            x0 = np.full(n_assets, self.config.max_leverage / n_assets)
+        
+        if self.config.solver == 'admm':
+            # Low-rank plus diagonal downside covariance, never formed densely
+            downside_cov = downside_covariance_factors(
+                returns,
+                self.config.downside_threshold,
+                self.config.shrinkage_factor if self.config.use_robust_estimation else None
+            )
+            result = solve_msrr_admm(
+                expected_returns,
+                downside_cov,
+                current_weights,
+                risk_aversion=self.config.risk_aversion,
+                proportional_cost=self.config.proportional_cost,
+                market_impact=self.config.market_impact,
+                budget=self.config.max_leverage,
+                lower=self.config.min_weight,
+                upper=self.config.max_weight,
+                target_return=self.config.target_return,
+                x0=x0,
+                max_iterations=self.config.admm_max_iterations,
+                tolerance=self.config.tolerance
+            )
+            success = result.converged
+            message = 'ADMM converged' if success else 'ADMM iteration limit reached'
+            n_iterations = result.iterations
+            optimal_weights = result.weights
+            covariance_quad = downside_cov.quad
+        else:
+            optimal_weights, success, message, n_iterations, downside_cov = self._optimize_slsqp(
+                returns, expected_returns, current_weights, x0
+            )
+            covariance_quad = lambda w: np.dot(w, np.dot(downside_cov, w))
+        
+        if not success:
+            self.logger.warning(f"Optimization did not converge: {message}")
+        
+        # Apply cardinality constraints (min/max assets)
+        optimal_weights = self._apply_cardinality_constraints(optimal_weights)
+        
+        # Compute portfolio statistics
+        portfolio_return = np.dot(optimal_weights, expected_returns)
+        portfolio_risk = np.sqrt(covariance_quad(optimal_weights))
+        sharpe_ratio = portfolio_return / portfolio_risk if portfolio_risk > 0 else 0
+        
+        # Factor risk decomposition (if factor exposures provided)
+        factor_risk = None
+        if factor_exposures is not None:
+            factor_risk = self._decompose_factor_risk(
+                optimal_weights,
+                factor_exposures,
+                downside_cov.dense() if self.config.solver == 'admm' else downside_cov
+            )
+        
+        # Transaction costs
+        turnover = np.sum(np.abs(optimal_weights - current_weights))
+        transaction_cost = (
+            self.config.fixed_cost * np.sum(optimal_weights != current_weights) +
+            self.config.proportional_cost * turnover +
+            self.config.market_impact * turnover ** 2
+        )
+        
+        return {
+            'weights': optimal_weights,
+            'expected_return': portfolio_return,
+            'downside_risk': portfolio_risk,
+            'sharpe_ratio': sharpe_ratio,
+            'turnover': turnover,
+            'transaction_cost': transaction_cost,
+            'n_assets_held': np.sum(optimal_weights > 1e-6),
+            'factor_risk': factor_risk,
+            'success': success,
+            'message': message,
+            'n_iterations': n_iterations
+        }
+    
+    def _optimize_slsqp(
+        self,
+        returns: np.ndarray,
+        expected_returns: np.ndarray,
+        current_weights: np.ndarray,
+        x0: np.ndarray
+    ) -> Tuple[np.ndarray, bool, str, int, np.ndarray]:
+        """
+        Solve with SLSQP on the dense downside covariance.
+        
+        Returns:
+            (weights, success, message, iterations, downside covariance)
+        """
+        n_assets = len(expected_returns)
+        
         # Estimate downside covariance matrix
         downside_cov = self._estimate_downside_covariance(returns)
         
@@ -96,45 +213,57 @@ class MSRROptimizer:
         if self.config.use_robust_estimation:
             downside_cov = self._shrink_covariance(downside_cov)
         
-        # Set up optimization problem
-        if current_weights is None:
-            current_weights = np.zeros(n_assets)
+        eps = self.config.turnover_smoothing
         
-        # Objective function: maximize risk-adjusted return minus transaction costs
+        # Objective function: maximize risk-adjusted return minus transaction costs.
+        # Returns (value, gradient) in closed form; SLSQP would otherwise
+        # difference the objective n_assets + 1 times per iteration.
         def objective(weights):
             # Expected return
             portfolio_return = np.dot(weights, expected_returns)
             
-            # Downside risk (semivariance)
-            portfolio_risk = np.sqrt(np.dot(weights, np.dot(downside_cov, weights)))
+            # Downside risk (semivariance): d sqrt(w'Sw) / dw = Sw / sqrt(w'Sw)
+            cov_weights = np.dot(downside_cov, weights)
+            portfolio_risk = np.sqrt(np.dot(weights, cov_weights))
+            risk_gradient = cov_weights / portfolio_risk if portfolio_risk > 0 else np.zeros(n_assets)
             
-            # Transaction costs
-            turnover = np.sum(np.abs(weights - current_weights))
+            # Transaction costs, with a smooth L1 turnover so the gradient exists at zero trade
+            trades = weights - current_weights
+            smooth_abs = np.sqrt(trades ** 2 + eps ** 2)
+            turnover = np.sum(smooth_abs - eps)
+            turnover_gradient = trades / smooth_abs
             transaction_cost = (
                 self.config.fixed_cost * np.sum(weights != current_weights) +
                 self.config.proportional_cost * turnover +
                 self.config.market_impact * turnover ** 2
             )
+            cost_gradient = (
+                self.config.proportional_cost + 2 * self.config.market_impact * turnover
+            ) * turnover_gradient
             
             # Risk-adjusted return minus costs
             utility = portfolio_return - self.config.risk_aversion * portfolio_risk - transaction_cost
+            gradient = expected_returns - self.config.risk_aversion * risk_gradient - cost_gradient
             
-            return -utility  # Minimize negative utility = maximize utility
+            return -utility, -gradient  # Minimize negative utility = maximize utility
         
-        # Constraints
+        # Constraints (linear, with constant Jacobians)
         constraints = []
         
         # Weights sum to max_leverage
+        ones = np.ones(n_assets)
         constraints.append({
             'type': 'eq',
-            'fun': lambda w: np.sum(w) - self.config.max_leverage
+            'fun': lambda w: np.sum(w) - self.config.max_leverage,
+            'jac': lambda w: ones
         })
         
         # Target return constraint (if specified)
         if self.config.target_return is not None:
             constraints.append({
                 'type': 'ineq',
-                'fun': lambda w: np.dot(w, expected_returns) - self.config.target_return
+                'fun': lambda w: np.dot(w, expected_returns) - self.config.target_return,
+                'jac': lambda w: expected_returns
             })
         
         # Bounds on individual weights
@@ -143,17 +272,12 @@ class MSRROptimizer:
             ub=np.full(n_assets, self.config.max_weight)
         )
         
-        # Initial guess (equal weights or current weights)
-        if np.sum(current_weights) > 0:
-            x0 = current_weights
-        else:
-            x0 = np.full(n_assets, self.config.max_leverage / n_assets)
-        
         # Optimize
         result = minimize(
             objective,
             x0,
             method='SLSQP',
+            jac=True,
             bounds=bounds,
             constraints=constraints,
             options={
@@ -162,48 +286,7 @@ class MSRROptimizer:
             }
         )
         
-        if not result.success:
-            self.logger.warning(f"Optimization did not converge: {result.message}")
-        
-        optimal_weights = result.x
-        
-        # Apply cardinality constraints (min/max assets)
-        optimal_weights = self._apply_cardinality_constraints(optimal_weights)
-        
-        # Compute portfolio statistics
-        portfolio_return = np.dot(optimal_weights, expected_returns)
-        portfolio_risk = np.sqrt(np.dot(optimal_weights, np.dot(downside_cov, optimal_weights)))
-        sharpe_ratio = portfolio_return / portfolio_risk if portfolio_risk > 0 else 0
-        
-        # Factor risk decomposition (if factor exposures provided)
-        factor_risk = None
-        if factor_exposures is not None:
-            factor_risk = self._decompose_factor_risk(
-                optimal_weights,
-                factor_exposures,
-                downside_cov
-            )
-        
-        # Transaction costs
-        turnover = np.sum(np.abs(optimal_weights - current_weights))
-        transaction_cost = (
-            self.config.fixed_cost * np.sum(optimal_weights != current_weights) +
-            self.config.proportional_cost * turnover +
-            self.config.market_impact * turnover ** 2
-        )
-        
-        return {
-            'weights': optimal_weights,
-            'expected_return': portfolio_return,
-            'downside_risk': portfolio_risk,
-            'sharpe_ratio': sharpe_ratio,
-            'turnover': turnover,
-            'transaction_cost': transaction_cost,
-            'n_assets_held': np.sum(optimal_weights > 1e-6),
-            'factor_risk': factor_risk,
-            'success': result.success,
-            'message': result.message
-        }
+        return result.x, result.success, result.message, result.nit, downside_cov
     
     def _estimate_returns(self, returns: np.ndarray) -> np.ndarray:
         """
@@ -15,12 +15,16 @@ Features:
 """
 
 import grpc
+from grpc_health.v1 import health, health_pb2, health_pb2_grpc
 from concurrent import futures
 import logging
+import os
 import time
 import signal
 import sys
-from typing import Dict, Optional
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 import numpy as np
 import torch
 
@@ -29,9 +33,14 @@ import ml_service_pb2
 import ml_service_pb2_grpc
 
 # Import our ML models
-from models.transformer import TransformerPredictor, TransformerConfig, create_ensemble
+# Optional serving modes (quantization, compilation, student) and feature
+# engineering (pandas/scipy/sklearn) are imported on first use to keep
+# startup fast; see lazy_imports.py for the startup-time budget.
+from models.transformer import TransformerPredictor, TransformerConfig, blend_predictions, create_ensemble
+from models.weights import resolve_weights
 from models.gaf import GAFRegimeClassifier, GAFConfig, MarketRegime
-from features.feature_engineer import FeatureEngineer
+from serving.model_slot import ModelBundle, ModelSlot
+from serving.warmup import ReadinessState, ServingStatus, warm_up_models
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +49,95 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Service name reported through grpc.health.v1 (package.Service from the proto)
+HEALTH_SERVICE_NAME = 'noderr.ml.MLService'
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Parse a boolean environment variable."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _read_model_version(model_path: str) -> str:
+    """Model version from {model_path}/VERSION, or a load timestamp."""
+    try:
+        with open(os.path.join(model_path, 'VERSION')) as f:
+            version = f.read().strip()
+        if version:
+            return version
+    except OSError:
+        pass
+    return time.strftime('%Y%m%d-%H%M%S')
+
+
+def _env_int_tuple(name: str, default: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Parse a comma-separated list of integers from an environment variable."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    return tuple(int(item) for item in value.split(',') if item.strip())
+
+
+@dataclass
+class ServerConfig:
+    """Configuration for the ML gRPC server."""
+    
+    # Network
+    port: int = 50051
+    max_workers: int = 10
+    
+    # Models
+    model_path: str = "/app/models"
+    quantize_int8: bool = False     # Serve the ensemble with dynamic int8 Linear layers (CPU only, large layers; see models/quantization.py)
+    compile_backend: Optional[str] = None  # "trace" (TorchScript) or "inductor" (torch.compile)
+    compile_batch_sizes: Tuple[int, ...] = (1, 8, 32)
+    
+    # Precision: fp32, bf16, or auto (bf16 on CPUs with native support).
+    # Models whose bf16 outputs drift beyond the tolerance stay in fp32.
+    precision: str = 'fp32'
+    precision_max_drift: float = 0.05
+    
+    # Serving mode: "ensemble" serves NN1-NN5; "student" serves the distilled
+    # student and optionally runs the ensemble as a shadow for comparison
+    serving_mode: str = "ensemble"
+    student_weights: str = "student"       # Weights file stem in model_path
+    shadow_ensemble: bool = True
+    shadow_max_pending: int = 32           # Drop shadow work beyond this backlog
+    
+    # Warm-up: synthetic batches per model and batch-size bucket before the
+    # replica reports SERVING
+    warmup_batch_sizes: Tuple[int, ...] = (1, 8, 32)
+    warmup_iterations: int = 3
+    
+    # Hot swap: shadow a reloaded bundle against the active one for this many
+    # predictions before promoting it (0 swaps as soon as it is warm)
+    candidate_shadow_requests: int = 0
+    
+    @classmethod
+    def from_env(cls) -> 'ServerConfig':
+        """Build configuration from environment variables."""
+        return cls(
+            port=int(os.getenv('GRPC_PORT', cls.port)),
+            max_workers=int(os.getenv('GRPC_MAX_WORKERS', cls.max_workers)),
+            model_path=os.getenv('MODEL_PATH', cls.model_path),
+            quantize_int8=_env_flag('ML_QUANTIZE_INT8', cls.quantize_int8),
+            compile_backend=os.getenv('ML_COMPILE_BACKEND') or None,
+            compile_batch_sizes=_env_int_tuple('ML_COMPILE_BATCH_SIZES', cls.compile_batch_sizes),
+            precision=os.getenv('ML_PRECISION', cls.precision),
+            precision_max_drift=float(os.getenv('ML_PRECISION_MAX_DRIFT', cls.precision_max_drift)),
+            serving_mode=os.getenv('ML_SERVING_MODE', cls.serving_mode),
+            student_weights=os.getenv('ML_STUDENT_WEIGHTS', cls.student_weights),
+            shadow_ensemble=_env_flag('ML_SHADOW_ENSEMBLE', cls.shadow_ensemble),
+            warmup_batch_sizes=_env_int_tuple('ML_WARMUP_BATCH_SIZES', cls.warmup_batch_sizes),
+            warmup_iterations=int(os.getenv('ML_WARMUP_ITERATIONS', cls.warmup_iterations)),
+            candidate_shadow_requests=int(
+                os.getenv('ML_CANDIDATE_SHADOW_REQUESTS', cls.candidate_shadow_requests)
+            ),
+        )
+
 
 class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
     """
@@ -49,23 +147,37 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
     logging, and performance monitoring.
     """
     
-    def __init__(self):
+    def __init__(self, config: Optional[ServerConfig] = None):
         """Initialize the ML service with all models."""
         logger.info("Initializing ML Service...")
+        self.config = config or ServerConfig()
+        self.readiness = ReadinessState()
         
-        # Initialize feature engineer
-        self.feature_engineer = FeatureEngineer()
-        logger.info("Feature engineer initialized")
+        # Feature engineer is created on first GenerateFeatures request
+        self._feature_engineer = None
+        self._feature_engineer_lock = threading.Lock()
         
-        # Initialize Transformer ensemble (NN1-NN5)
-        logger.info("Loading Transformer ensemble...")
-        self.transformer_ensemble = self._load_transformer_ensemble()
-        logger.info(f"Loaded {len(self.transformer_ensemble)} Transformer models")
+        if self.config.serving_mode not in ('ensemble', 'student'):
+            raise ValueError(f"Unknown serving mode: {self.config.serving_mode}")
         
-        # Initialize GAF classifier
-        logger.info("Loading GAF classifier...")
-        self.gaf_classifier = GAFRegimeClassifier()
-        logger.info("GAF classifier initialized")
+        # Active model bundle; reloads swap it without blocking requests
+        self.model_slot = ModelSlot(self._load_bundle())
+        self._reload_lock = threading.Lock()
+        
+        # Background shadow work: student vs ensemble, active vs candidate
+        self.shadow_executor = None
+        self.shadow_pending = 0
+        self.shadow_count = 0
+        self.shadow_abs_error = {'return': 0.0, 'volatility': 0.0, 'confidence': 0.0}
+        self.shadow_lock = threading.Lock()
+        
+        student_shadow = self.config.serving_mode == 'student' and self.config.shadow_ensemble
+        if student_shadow or self.config.candidate_shadow_requests > 0:
+            self.shadow_executor = futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='shadow'
+            )
+        if self.config.serving_mode == 'student':
+            logger.info(f"Serving student model (shadow ensemble: {self.config.shadow_ensemble})")
         
         # Performance metrics
         self.request_count = 0
@@ -74,23 +186,274 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
         
         logger.info("ML Service initialization complete")
     
+    def warm_up(self):
+        """
+        Warm up every serving model, then mark the service SERVING.
+        
+        Runs synthetic batches through the ensemble (served directly or as
+        the student's shadow), the student and the GAF classifier for each
+        configured batch-size bucket.
+        """
+        self.readiness.set(ServingStatus.WARMING_UP)
+        
+        try:
+            report = self._warm_up_bundle(self.model_slot.current)
+        except Exception as e:
+            logger.error(f"Warm-up failed: {str(e)}", exc_info=True)
+            self.readiness.set(ServingStatus.NOT_SERVING)
+            return
+        
+        self.readiness.warmup_report = report
+        logger.info(f"Warm-up complete in {report['total_ms']:.0f}ms")
+        self.readiness.set(ServingStatus.SERVING)
+    
+    def _warm_up_bundle(self, bundle: ModelBundle) -> Dict:
+        """Run warm-up batches through every model in a bundle."""
+        models = dict(bundle.ensemble)
+        if bundle.student is not None:
+            models['student'] = bundle.student
+        
+        return warm_up_models(
+            models,
+            gaf_classifier=bundle.gaf_classifier,
+            batch_sizes=self.config.warmup_batch_sizes,
+            iters=self.config.warmup_iterations
+        )
+    
+    def reload_models(self) -> bool:
+        """
+        Load, warm up and install a new model bundle from the model path.
+        
+        Runs alongside live traffic: requests keep using the active bundle
+        until the new one is warm. With candidate_shadow_requests > 0 the new
+        bundle is staged and promoted after that many shadow comparisons;
+        otherwise it is swapped in immediately.
+        
+        Returns:
+            False if another reload is in progress or loading failed
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            logger.warning("Model reload already in progress, ignoring")
+            return False
+        
+        try:
+            logger.info(f"Reloading models from {self.config.model_path}...")
+            bundle = self._load_bundle()
+            report = self._warm_up_bundle(bundle)
+            logger.info(f"Warm-up of models {bundle.version} complete in {report['total_ms']:.0f}ms")
+            
+            if self.config.candidate_shadow_requests > 0:
+                self.model_slot.stage(bundle)
+            else:
+                self.model_slot.swap(bundle)
+            return True
+        except Exception as e:
+            logger.error(f"Model reload failed, keeping {self.model_slot.current.version}: {str(e)}",
+                         exc_info=True)
+            return False
+        finally:
+            self._reload_lock.release()
+    
+    @property
+    def feature_engineer(self):
+        """Feature engineer, imported and created on first use."""
+        if self._feature_engineer is None:
+            with self._feature_engineer_lock:
+                if self._feature_engineer is None:
+                    from features.feature_engineer import FeatureEngineer
+                    self._feature_engineer = FeatureEngineer()
+                    logger.info("Feature engineer initialized")
+        return self._feature_engineer
+    
+    def _load_bundle(self) -> ModelBundle:
+        """Load every serving model from the model path into a new bundle."""
+        version = _read_model_version(self.config.model_path)
+        logger.info(f"Loading models version {version}...")
+        
+        # Initialize Transformer ensemble (NN1-NN5)
+        logger.info("Loading Transformer ensemble...")
+        ensemble = self._load_transformer_ensemble()
+        logger.info(f"Loaded {len(ensemble)} Transformer models")
+        
+        # Distilled student (student serving mode)
+        student = None
+        if self.config.serving_mode == 'student':
+            logger.info("Loading distilled student model...")
+            student = self._load_student()
+        
+        # Initialize GAF classifier
+        logger.info("Loading GAF classifier...")
+        gaf_classifier = GAFRegimeClassifier()
+        gaf_path = resolve_weights(self.config.model_path, 'gaf')
+        if gaf_path is not None:
+            gaf_classifier.load_model(gaf_path)
+        self._apply_precision({}, gaf_classifier)
+        logger.info("GAF classifier initialized")
+        
+        return ModelBundle(
+            version=version,
+            ensemble=ensemble,
+            gaf_classifier=gaf_classifier,
+            student=student
+        )
+    
     def _load_transformer_ensemble(self) -> Dict[str, TransformerPredictor]:
         """
         Load the Transformer ensemble (NN1-NN5).
         
-        In production, this would load pre-trained weights.
-        For now, we create the architecture ready for training.
+        Weights are read from {model_path}/{name}.safetensors (memory-mapped,
+        shared across processes) or {name}.pth. Models without weights keep
+        their initialization, ready for training.
         """
         ensemble = create_ensemble(
             n_features=94,
             seq_len=60
         )
         
-        # In production, load weights here:
-        # for name, model in ensemble.items():
-        #     model.load_model(f'models/weights/{name}.pth')
+        for name, model in ensemble.items():
+            path = resolve_weights(self.config.model_path, name)
+            if path is not None:
+                model.load_model(path)
+            else:
+                logger.warning(f"No weights found for {name} in {self.config.model_path}")
+        
+        return self._prepare_models(ensemble)
+    
+    def _load_student(self):
+        """Load the distilled student model (see training/distillation.py)."""
+        from training.distillation import create_student
+        
+        student = create_student(n_features=94, seq_len=60)
+        
+        path = resolve_weights(self.config.model_path, self.config.student_weights)
+        if path is not None:
+            student.load_model(path)
+        else:
+            logger.warning(
+                f"Student weights '{self.config.student_weights}' not found in "
+                f"{self.config.model_path}, serving untrained student"
+            )
+        
+        return self._prepare_models({'student': student})['student']
+    
+    def _apply_precision(self, models: Dict[str, TransformerPredictor], gaf_classifier=None):
+        """Set the configured precision and validate its drift against fp32."""
+        if self.config.precision == 'fp32':
+            return
+        
+        from models.precision import reference_batch, set_precision, validate_precision
+        
+        for model in list(models.values()) + [gaf_classifier]:
+            if model is not None:
+                set_precision(model, self.config.precision)
+        
+        validate_precision(
+            models,
+            gaf_classifier=gaf_classifier,
+            reference=reference_batch(self.config.model_path, n_features=94, seq_len=60),
+            max_drift=self.config.precision_max_drift
+        )
+    
+    def _prepare_models(self, models: Dict[str, TransformerPredictor]) -> Dict:
+        """Apply the configured quantization, precision and compilation to serving models."""
+        if self.config.quantize_int8:
+            from models.quantization import quantize_ensemble
+            logger.info("Quantizing models to dynamic int8...")
+            models = quantize_ensemble(models)
+            if self.config.precision != 'fp32':
+                logger.warning("ML_PRECISION is ignored for int8-quantized models")
+        else:
+            # Validated on the eager models, before compilation bakes it in
+            self._apply_precision(models)
+        
+        if self.config.compile_backend:
+            from models.compilation import compile_ensemble
+            logger.info(f"Compiling models ({self.config.compile_backend})...")
+            models = compile_ensemble(
+                models,
+                backend=self.config.compile_backend,
+                batch_sizes=self.config.compile_batch_sizes
+            )
+        
+        return models
+    
+    def _predict_ensemble(
+        self,
+        ensemble: Dict[str, TransformerPredictor],
+        features_tensor: torch.Tensor
+    ) -> Tuple[float, float, float]:
+        """Confidence-weighted ensemble prediction (blend_predictions) for the first sample."""
+        outputs = []
+        for model in ensemble.values():
+            pred = model.predict(features_tensor)
+            outputs.append(tuple(
+                torch.tensor(pred[key][:1], dtype=torch.float64).unsqueeze(-1)
+                for key in ('return', 'volatility', 'confidence')
+            ))
         
-        return ensemble
+        ensemble_return, ensemble_volatility, ensemble_confidence = blend_predictions(outputs)
+        return ensemble_return.item(), ensemble_volatility.item(), ensemble_confidence.item()
+    
+    def _predict_bundle(
+        self,
+        bundle: ModelBundle,
+        features_tensor: torch.Tensor
+    ) -> Tuple[float, float, float]:
+        """Prediction served by a bundle: its student if loaded, else its ensemble."""
+        if bundle.student is not None:
+            pred = bundle.student.predict(features_tensor)
+            return pred['return'][0], pred['volatility'][0], pred['confidence'][0]
+        return self._predict_ensemble(bundle.ensemble, features_tensor)
+    
+    def _submit_shadow(self, fn, *args):
+        """Queue shadow work, dropping it if the backlog is full."""
+        with self.shadow_lock:
+            if self.shadow_pending >= self.config.shadow_max_pending:
+                return
+            self.shadow_pending += 1
+        self.shadow_executor.submit(self._run_shadow, fn, *args)
+    
+    def _run_shadow(self, fn, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.error(f"Shadow error: {str(e)}", exc_info=True)
+        finally:
+            with self.shadow_lock:
+                self.shadow_pending -= 1
+    
+    def _shadow_student(
+        self,
+        bundle: ModelBundle,
+        features_tensor: torch.Tensor,
+        served: Tuple[float, float, float]
+    ):
+        """Compare the served student prediction against the full ensemble."""
+        shadow = self._predict_ensemble(bundle.ensemble, features_tensor)
+        with self.shadow_lock:
+            self.shadow_count += 1
+            for key, s_value, e_value in zip(self.shadow_abs_error, served, shadow):
+                self.shadow_abs_error[key] += abs(s_value - e_value)
+            if self.shadow_count % 1000 == 0:
+                mae = {k: v / self.shadow_count for k, v in self.shadow_abs_error.items()}
+                logger.info(f"Shadow ensemble MAE after {self.shadow_count} requests: {mae}")
+    
+    def _shadow_candidate(
+        self,
+        candidate: ModelBundle,
+        features_tensor: torch.Tensor,
+        served: Tuple[float, float, float]
+    ):
+        """Compare a staged candidate bundle against the served prediction."""
+        shadow = self._predict_bundle(candidate, features_tensor)
+        count = self.model_slot.record_prediction(candidate.version, served, shadow)
+        if count >= self.config.candidate_shadow_requests and self.model_slot.candidate is candidate:
+            self.model_slot.promote()
+    
+    def _shadow_candidate_regime(self, candidate: ModelBundle, prices: np.ndarray, served: str):
+        """Compare a staged candidate's regime classification with the served one."""
+        result = candidate.gaf_classifier.classify(prices, return_image=False)
+        self.model_slot.record_regime(candidate.version, served, result['regime'])
     
     def Predict(self, request, context):
         """
@@ -111,31 +474,22 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             # Convert request data to numpy arrays
             features = np.array(request.features).reshape(request.batch_size, request.seq_len, request.n_features)
             
-            # Get ensemble predictions
-            predictions = []
-            confidences = []
+            # Convert to torch tensor
+            features_tensor = torch.from_numpy(features).float()
             
-            for name, model in self.transformer_ensemble.items():
-                # Convert to torch tensor
-                features_tensor = torch.from_numpy(features).float()
-                
-                # Get prediction
-                pred = model.predict(features_tensor)
-                
-                predictions.append({
-                    'return': pred['return'][0],
-                    'volatility': pred['volatility'][0],
-                    'confidence': pred['confidence'][0]
-                })
-                confidences.append(pred['confidence'][0])
+            # One bundle per request, so a concurrent swap never mixes versions
+            bundle = self.model_slot.current
+            prediction = self._predict_bundle(bundle, features_tensor)
+            model_count = 1 if bundle.student is not None else len(bundle.ensemble)
             
-            # Ensemble averaging weighted by confidence
-            total_confidence = sum(confidences)
-            weights = [c / total_confidence for c in confidences]
+            if bundle.student is not None and self.config.shadow_ensemble:
+                self._submit_shadow(self._shadow_student, bundle, features_tensor, prediction)
             
-            ensemble_return = sum(p['return'] * w for p, w in zip(predictions, weights))
-            ensemble_volatility = sum(p['volatility'] * w for p, w in zip(predictions, weights))
-            ensemble_confidence = sum(confidences) / len(confidences)
+            candidate = self.model_slot.candidate
+            if candidate is not None:
+                self._submit_shadow(self._shadow_candidate, candidate, features_tensor, prediction)
+            
+            ensemble_return, ensemble_volatility, ensemble_confidence = prediction
             
             # Update metrics
             latency = time.time() - start_time
@@ -150,7 +504,7 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
                 predicted_return=float(ensemble_return),
                 predicted_volatility=float(ensemble_volatility),
                 confidence=float(ensemble_confidence),
-                model_count=len(self.transformer_ensemble),
+                model_count=model_count,
                 latency_ms=latency * 1000
             )
             
@@ -182,7 +536,11 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             prices = np.array(request.prices)
             
             # Classify regime
-            result = self.gaf_classifier.classify(prices, return_image=False)
+            result = self.model_slot.current.gaf_classifier.classify(prices, return_image=False)
+            
+            candidate = self.model_slot.candidate
+            if candidate is not None:
+                self._submit_shadow(self._shadow_candidate_regime, candidate, prices, result['regime'])
             
             # Update metrics
             latency = time.time() - start_time
@@ -330,18 +688,22 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
         """
         Check service health.
         
+        Status is SERVING only once warm-up has completed.
+        
         Returns:
             HealthCheckResponse with service status
         """
         try:
             uptime = time.time() - self.start_time
             avg_latency = self.total_latency / max(self.request_count, 1)
+            status = "SERVING" if self.readiness.is_ready else "NOT_SERVING"
             
             response = ml_service_pb2.HealthCheckResponse(
-                status="healthy",
+                status=status,
                 uptime_seconds=int(uptime),
                 request_count=self.request_count,
-                avg_latency_ms=avg_latency * 1000
+                avg_latency_ms=avg_latency * 1000,
+                version=self.model_slot.current.version
             )
             
             return response
@@ -350,28 +712,43 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             logger.error(f"Health check error: {str(e)}", exc_info=True)
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"Health check failed: {str(e)}")
-            return ml_service_pb2.HealthCheckResponse(status="unhealthy")
+            return ml_service_pb2.HealthCheckResponse(status="NOT_SERVING")
 
 
-def serve(port: int = 50051, max_workers: int = 10):
+def serve(config: Optional[ServerConfig] = None):
     """
     Start the gRPC server.
     
     Args:
-        port: Port to listen on
-        max_workers: Maximum number of worker threads
+        config: Server configuration (defaults to environment variables)
     """
+    config = config or ServerConfig.from_env()
+    port = config.port
+    
     server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=max_workers),
+        futures.ThreadPoolExecutor(max_workers=config.max_workers),
         options=[
             ('grpc.max_send_message_length', 50 * 1024 * 1024),  # 50MB
             ('grpc.max_receive_message_length', 50 * 1024 * 1024),  # 50MB
         ]
     )
     
-    ml_service_pb2_grpc.add_MLServiceServicer_to_server(
-        MLServiceServicer(), server
-    )
+    servicer = MLServiceServicer(config)
+    ml_service_pb2_grpc.add_MLServiceServicer_to_server(servicer, server)
+    
+    # Standard grpc.health.v1 service, NOT_SERVING until warm-up completes
+    health_servicer = health.HealthServicer()
+    health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+    
+    def publish_health(status: ServingStatus):
+        grpc_status = (
+            health_pb2.HealthCheckResponse.SERVING if status.is_ready
+            else health_pb2.HealthCheckResponse.NOT_SERVING
+        )
+        for service in ('', HEALTH_SERVICE_NAME):
+            health_servicer.set(service, grpc_status)
+    
+    servicer.readiness.add_listener(publish_health)
     
     server.add_insecure_port(f'[::]:{port}')
     
@@ -382,6 +759,7 @@ def serve(port: int = 50051, max_workers: int = 10):
     # Graceful shutdown handler
     def handle_shutdown(signum, frame):
         logger.info("Received shutdown signal, stopping server...")
+        servicer.readiness.set(ServingStatus.NOT_SERVING)
         server.stop(grace=5)
         logger.info("Server stopped")
         sys.exit(0)
@@ -389,10 +767,21 @@ def serve(port: int = 50051, max_workers: int = 10):
     signal.signal(signal.SIGINT, handle_shutdown)
     signal.signal(signal.SIGTERM, handle_shutdown)
     
+    # SIGHUP hot-swaps models from MODEL_PATH without dropping traffic
+    def handle_reload(signum, frame):
+        logger.info("Received SIGHUP, reloading models in the background...")
+        threading.Thread(target=servicer.reload_models, name='model-reload', daemon=True).start()
+    
+    signal.signal(signal.SIGHUP, handle_reload)
+    
+    # Warm up before reporting SERVING so load balancers skip cold replicas
+    servicer.warm_up()
+    
     try:
         server.wait_for_termination()
     except KeyboardInterrupt:
         logger.info("Server interrupted, shutting down...")
+        servicer.readiness.set(ServingStatus.NOT_SERVING)
         server.stop(grace=5)
 
 
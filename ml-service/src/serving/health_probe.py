@@ -0,0 +1,39 @@
+"""
+Container health probe for the ML service.
+
+Queries the standard grpc.health.v1 service and exits 0 only when the
+server reports SERVING, i.e. after model warm-up has completed.
+
+Usage:
+    python -m serving.health_probe [--port 50051] [--service ""]
+"""
+
+import argparse
+import os
+import sys
+
+import grpc
+from grpc_health.v1 import health_pb2, health_pb2_grpc
+
+
+def probe(host: str, port: int, service: str = '', timeout: float = 5.0) -> bool:
+    """Return True if the service at host:port reports SERVING."""
+    with grpc.insecure_channel(f'{host}:{port}') as channel:
+        try:
+            response = health_pb2_grpc.HealthStub(channel).Check(
+                health_pb2.HealthCheckRequest(service=service), timeout=timeout
+            )
+        except grpc.RpcError:
+            return False
+    return response.status == health_pb2.HealthCheckResponse.SERVING
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="ML service readiness probe")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=int(os.getenv('GRPC_PORT', 50051)))
+    parser.add_argument('--service', default='')
+    parser.add_argument('--timeout', type=float, default=5.0)
+    args = parser.parse_args()
+
+    sys.exit(0 if probe(args.host, args.port, args.service, args.timeout) else 1)
@@ -0,0 +1,194 @@
+"""
+Versioned Model Slot for Hot Model Swaps
+
+Deploying new NN1-NN5 or GAF weights used to require a process restart,
+dropping the replica out of rotation and discarding its warm caches. A
+`ModelSlot` instead holds an immutable `ModelBundle` (ensemble, optional
+student, GAF classifier and a version string):
+
+- RPC handlers read `slot.current` once per request and use that bundle
+  for the whole request, so in-flight RPCs finish on the version they
+  started with and are never blocked by a swap
+- A new bundle is loaded and warmed up in the background, then either
+  swapped in immediately (`swap`) or staged as a candidate (`stage`) that
+  runs side by side with the active bundle in shadow until enough
+  comparisons have been recorded to `promote` it
+- Swapping is a single reference assignment; the previous bundle is freed
+  once its last in-flight request releases it
+
+Usage:
+    slot = ModelSlot(initial_bundle)
+    bundle = slot.current                  # once per request
+    slot.stage(new_bundle)                 # shadow comparison
+    slot.record_prediction(served, candidate)
+    slot.promote()
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Number of swaps kept in the slot history
+HISTORY_SIZE = 10
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """One deployable version of the serving models."""
+    version: str
+    ensemble: Dict[str, object]
+    gaf_classifier: object
+    student: Optional[object] = None
+    loaded_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class CandidateStats:
+    """Shadow comparison between the active bundle and a staged candidate."""
+    version: str
+    predictions: int = 0
+    abs_error: Dict[str, float] = field(
+        default_factory=lambda: {'return': 0.0, 'volatility': 0.0, 'confidence': 0.0}
+    )
+    regimes: int = 0
+    regime_agreement: int = 0
+
+    def summary(self) -> Dict:
+        """Mean absolute prediction difference and regime agreement rate."""
+        return {
+            'version': self.version,
+            'predictions': self.predictions,
+            'mae': {
+                key: value / max(self.predictions, 1)
+                for key, value in self.abs_error.items()
+            },
+            'regimes': self.regimes,
+            'regime_agreement': self.regime_agreement / max(self.regimes, 1),
+        }
+
+
+class ModelSlot:
+    """
+    Atomic holder for the active and candidate model bundles.
+
+    Reads of `current` and `candidate` are lock-free; swaps, staging and
+    shadow statistics are serialized by an internal lock.
+    """
+
+    def __init__(self, bundle: ModelBundle):
+        self._current = bundle
+        self._candidate: Optional[ModelBundle] = None
+        self._candidate_stats: Optional[CandidateStats] = None
+        self._lock = threading.Lock()
+        self.history: List[Tuple[str, float]] = [(bundle.version, time.time())]
+
+    @property
+    def current(self) -> ModelBundle:
+        return self._current
+
+    @property
+    def candidate(self) -> Optional[ModelBundle]:
+        return self._candidate
+
+    @property
+    def candidate_stats(self) -> Optional[Dict]:
+        with self._lock:
+            return self._candidate_stats.summary() if self._candidate_stats else None
+
+    def swap(self, bundle: ModelBundle) -> ModelBundle:
+        """
+        Make `bundle` the active version immediately.
+
+        Any staged candidate is discarded.
+
+        Returns:
+            The previously active bundle
+        """
+        with self._lock:
+            previous = self._current
+            self._current = bundle
+            self._candidate = None
+            self._candidate_stats = None
+            self.history.append((bundle.version, time.time()))
+            del self.history[:-HISTORY_SIZE]
+
+        logger.info(f"Swapped models {previous.version} -> {bundle.version}")
+        return previous
+
+    def stage(self, bundle: ModelBundle):
+        """Stage `bundle` as a shadow candidate, replacing any earlier candidate."""
+        with self._lock:
+            self._candidate = bundle
+            self._candidate_stats = CandidateStats(version=bundle.version)
+
+        logger.info(f"Staged models {bundle.version} as shadow candidate of {self._current.version}")
+
+    def promote(self) -> Optional[Dict]:
+        """
+        Swap the staged candidate in.
+
+        Returns:
+            Shadow comparison summary of the promoted candidate, or None if
+            no candidate was staged
+        """
+        with self._lock:
+            candidate = self._candidate
+            stats = self._candidate_stats
+
+        if candidate is None:
+            return None
+
+        summary = stats.summary()
+        logger.info(f"Promoting {candidate.version} after shadow comparison: {summary}")
+        self.swap(candidate)
+        return summary
+
+    def discard(self):
+        """Drop the staged candidate without swapping."""
+        with self._lock:
+            candidate = self._candidate
+            self._candidate = None
+            self._candidate_stats = None
+
+        if candidate is not None:
+            logger.info(f"Discarded candidate models {candidate.version}")
+
+    def record_prediction(
+        self,
+        version: str,
+        served: Sequence[float],
+        candidate: Sequence[float]
+    ) -> int:
+        """
+        Record one (return, volatility, confidence) shadow comparison.
+
+        Args:
+            version: Candidate version the comparison was computed with;
+                     ignored if the candidate has since changed
+            served: Prediction returned to the client
+            candidate: Candidate bundle's prediction for the same request
+
+        Returns:
+            Number of prediction comparisons recorded for the candidate
+        """
+        with self._lock:
+            stats = self._candidate_stats
+            if stats is None or stats.version != version:
+                return 0
+            stats.predictions += 1
+            for key, s_value, c_value in zip(stats.abs_error, served, candidate):
+                stats.abs_error[key] += abs(s_value - c_value)
+            return stats.predictions
+
+    def record_regime(self, version: str, served: str, candidate: str):
+        """Record whether the candidate agrees with the served regime."""
+        with self._lock:
+            stats = self._candidate_stats
+            if stats is None or stats.version != version:
+                return
+            stats.regimes += 1
+            stats.regime_agreement += int(served == candidate)
@@ -0,0 +1,337 @@
+"""
+Memory-Mapped Feature Store and Streaming Window Dataset
+
+Training windows are (seq_len, 94) slices of a per-symbol feature history.
+Materializing every window, or even the whole feature history, in RAM
+caps the universe we can train on, so windows are streamed straight out of
+a memory-mapped store instead:
+
+    {store}/features.npy   float32 (symbols, bars, n_features)
+    {store}/close.npy      float64 (symbols, bars)
+
+- `FeatureStore` creates and opens the store with `np.load(mmap_mode='r')`;
+  the OS page cache holds the hot pages, shared by every DataLoader worker
+- `WindowDataset` is an IterableDataset over (symbol, end bar) pairs. A
+  window is a zero-copy view of the mapping; the only copy is the collate
+  step that stacks a batch into a fresh tensor
+- Shuffling uses contiguous chunks of windows in random order (sequential
+  page access) mixed through a bounded shuffle buffer, so memory stays
+  O(shuffle_buffer) regardless of dataset size
+- Workers shard chunks by worker id and each reopens the mapping, so
+  nothing but the store path is pickled to worker processes
+
+Targets per window ending at bar t (last observed bar t-1):
+    return      log(close[t-1+h] / close[t-1])
+    volatility  std of 1-bar log returns over bars t..t-1+h
+with h the prediction horizon.
+
+Usage:
+    store = FeatureStore.create('/data/store', n_symbols, n_bars)
+    store.write_symbol(0, features, close)
+    loader = create_loader(WindowDataset('/data/store', seq_len=60), batch_size=256)
+"""
+
+import os
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, IterableDataset, get_worker_info
+from typing import Iterator, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+FEATURES_FILE = 'features.npy'
+CLOSE_FILE = 'close.npy'
+
+
+class FeatureStore:
+    """
+    On-disk (symbols, bars, n_features) feature tensor with close prices.
+
+    Arrays are memory-mapped; opening a store costs no RAM beyond the pages
+    actually touched.
+    """
+
+    def __init__(self, path: str, mode: str = 'r'):
+        self.path = path
+        self.features = np.load(os.path.join(path, FEATURES_FILE), mmap_mode=mode)
+        self.close = np.load(os.path.join(path, CLOSE_FILE), mmap_mode=mode)
+
+        if self.features.shape[:2] != self.close.shape:
+            raise ValueError(
+                f"Feature store {path} is inconsistent: features {self.features.shape}, "
+                f"close {self.close.shape}"
+            )
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        n_symbols: int,
+        n_bars: int,
+        n_features: int = 94
+    ) -> 'FeatureStore':
+        """Allocate an empty store on disk, opened for writing."""
+        os.makedirs(path, exist_ok=True)
+        np.lib.format.open_memmap(
+            os.path.join(path, FEATURES_FILE), mode='w+',
+            dtype=np.float32, shape=(n_symbols, n_bars, n_features)
+        ).flush()
+        np.lib.format.open_memmap(
+            os.path.join(path, CLOSE_FILE), mode='w+',
+            dtype=np.float64, shape=(n_symbols, n_bars)
+        ).flush()
+        return cls(path, mode='r+')
+
+    @property
+    def n_symbols(self) -> int:
+        return self.features.shape[0]
+
+    @property
+    def n_bars(self) -> int:
+        return self.features.shape[1]
+
+    @property
+    def n_features(self) -> int:
+        return self.features.shape[2]
+
+    def write_symbol(self, index: int, features: np.ndarray, close: np.ndarray):
+        """Write one symbol's (bars, n_features) history and close prices."""
+        self.features[index] = features
+        self.close[index] = close
+
+    def flush(self):
+        for array in (self.features, self.close):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+
+def window_targets(close: np.ndarray, end: int, horizon: int) -> np.ndarray:
+    """
+    Forward (return, volatility) targets for a window ending at bar `end`.
+
+    Args:
+        close: One symbol's close prices
+        end: Exclusive end bar of the input window
+        horizon: Prediction horizon in bars
+
+    Returns:
+        float32 array [log return, realized volatility]
+    """
+    path = np.log(close[end - 1:end + horizon])
+    steps = np.diff(path)
+    return np.array([path[-1] - path[0], steps.std() if horizon > 1 else abs(steps[0])],
+                    dtype=np.float32)
+
+
+class WindowDataset(IterableDataset):
+    """
+    Streams (window, target) pairs from a FeatureStore.
+
+    Args:
+        store_path: FeatureStore directory
+        seq_len: Window length in bars
+        horizon: Target horizon in bars
+        symbols: Symbol indices to use (default all)
+        bar_range: [start, stop) bars windows and targets may touch, for
+                   time-based train/validation splits (default all)
+        stride: Bars between consecutive window ends
+        shuffle: Randomize window order
+        shuffle_buffer: Windows held in the shuffle buffer
+        chunk_size: Contiguous windows read together before shuffling
+        seed: Base seed; the epoch is mixed in via set_epoch()
+    """
+
+    def __init__(
+        self,
+        store_path: str,
+        seq_len: int = 60,
+        horizon: int = 1,
+        symbols: Optional[Sequence[int]] = None,
+        bar_range: Optional[Tuple[int, int]] = None,
+        stride: int = 1,
+        shuffle: bool = True,
+        shuffle_buffer: int = 8192,
+        chunk_size: int = 256,
+        seed: int = 0
+    ):
+        super().__init__()
+        self.store_path = store_path
+        self.seq_len = seq_len
+        self.horizon = horizon
+        self.stride = stride
+        self.shuffle = shuffle
+        self.shuffle_buffer = shuffle_buffer
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.epoch = 0
+
+        # Only the shape is read here; workers open their own mapping
+        store = FeatureStore(store_path)
+        self.symbols = list(range(store.n_symbols)) if symbols is None else list(symbols)
+        start, stop = bar_range or (0, store.n_bars)
+
+        # Window ends t with start <= t - seq_len and t - 1 + horizon < stop
+        self.first_end = start + seq_len
+        self.last_end = stop - horizon
+        self.ends_per_symbol = max(0, (self.last_end - self.first_end) // stride + 1)
+
+        self._store: Optional[FeatureStore] = None
+
+    def __len__(self) -> int:
+        return len(self.symbols) * self.ends_per_symbol
+
+    def __getstate__(self):
+        # Pickling a memmap copies its data; workers reopen the store instead
+        state = dict(self.__dict__)
+        state['_store'] = None
+        return state
+
+    def set_epoch(self, epoch: int):
+        """Reseed the shuffle order for a new epoch."""
+        self.epoch = epoch
+
+    def _chunks(self) -> List[Tuple[int, int]]:
+        """(symbol, first window offset) for every chunk of contiguous windows."""
+        return [
+            (symbol, offset)
+            for symbol in self.symbols
+            for offset in range(0, self.ends_per_symbol, self.chunk_size)
+        ]
+
+    def _windows(self, chunks: Sequence[Tuple[int, int]]) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        features = self._store.features
+        close = self._store.close
+
+        for symbol, offset in chunks:
+            for i in range(offset, min(offset + self.chunk_size, self.ends_per_symbol)):
+                end = self.first_end + i * self.stride
+                yield (
+                    features[symbol, end - self.seq_len:end],
+                    window_targets(close[symbol], end, self.horizon)
+                )
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        if self._store is None:
+            self._store = FeatureStore(self.store_path)
+
+        chunks = self._chunks()
+        rng = np.random.default_rng((self.seed, self.epoch))
+        if self.shuffle:
+            rng.shuffle(chunks)
+
+        worker = get_worker_info()
+        if worker is not None:
+            chunks = chunks[worker.id::worker.num_workers]
+
+        if not self.shuffle:
+            yield from self._windows(chunks)
+            return
+
+        # Bounded shuffle buffer: replace a random slot with each new window
+        buffer = []
+        for sample in self._windows(chunks):
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(sample)
+                continue
+            i = rng.integers(len(buffer))
+            yield buffer[i]
+            buffer[i] = sample
+
+        rng.shuffle(buffer)
+        yield from buffer
+
+
+def collate_windows(samples: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Stack windows into (batch, seq_len, n_features) and (batch, 2) tensors."""
+    windows, targets = zip(*samples)
+    return torch.from_numpy(np.stack(windows)), torch.from_numpy(np.stack(targets))
+
+
+def create_loader(
+    dataset: WindowDataset,
+    batch_size: int = 256,
+    num_workers: int = 2,
+    prefetch_factor: int = 4
+) -> DataLoader:
+    """
+    DataLoader with worker processes over a WindowDataset.
+
+    Args:
+        dataset: Window dataset
+        batch_size: Windows per batch
+        num_workers: Loader processes (0 loads in the training process)
+        prefetch_factor: Batches prefetched per worker
+
+    Returns:
+        DataLoader yielding (windows, targets) tensor batches
+    """
+    # Workers are recreated every epoch so they pick up set_epoch()
+    kwargs = {'prefetch_factor': prefetch_factor} if num_workers > 0 else {}
+
+    return DataLoader(
+        dataset,
+        batch_size=batch_size,
+        num_workers=num_workers,
+        collate_fn=collate_windows,
+        pin_memory=torch.cuda.is_available(),
+        **kwargs
+    )
+
+
+def synthetic_store(
+    path: str,
+    n_symbols: int = 8,
+    n_bars: int = 4000,
+    n_features: int = 94,
+    seed: int = 0
+) -> FeatureStore:
+    """Write a store of random-walk prices and noisy features (demos and benchmarks)."""
+    rng = np.random.default_rng(seed)
+    store = FeatureStore.create(path, n_symbols, n_bars, n_features)
+
+    for symbol in range(n_symbols):
+        returns = rng.normal(0, 0.01, n_bars)
+        close = 100 * np.exp(np.cumsum(returns))
+        features = rng.normal(0, 1, (n_bars, n_features)).astype(np.float32)
+        features[:, 0] = returns / 0.01
+        store.write_symbol(symbol, features, close)
+
+    store.flush()
+    return FeatureStore(path)
+
+
+if __name__ == '__main__':
+    import resource
+    import tempfile
+    import time
+
+    logging.basicConfig(level=logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = synthetic_store(tmp, n_symbols=16, n_bars=8000)
+        size_mb = store.features.nbytes / 1e6
+
+        dataset = WindowDataset(tmp, seq_len=60, horizon=5, shuffle_buffer=4096)
+        loader = create_loader(dataset, batch_size=256, num_workers=2)
+
+        start = time.perf_counter()
+        n_windows = 0
+        for windows, targets in loader:
+            n_windows += len(windows)
+        elapsed = time.perf_counter() - start
+
+        rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        print(f"\n{'='*60}")
+        print("Window Dataset Throughput")
+        print(f"{'='*60}")
+        print(f"Feature store:     {store.n_symbols} symbols x {store.n_bars} bars x "
+              f"{store.n_features} features ({size_mb:.0f}MB)")
+        print(f"Windows streamed:  {n_windows} of {len(dataset)}")
+        print(f"Batch shape:       {tuple(windows.shape)}, targets {tuple(targets.shape)}")
+        print(f"Throughput:        {n_windows / elapsed:,.0f} windows/s")
+        print(f"Peak RSS (main):   {rss_mb:.0f}MB")
+
+    print(f"\n{'='*60}")
+    print("✅ Window dataset test complete!")
@@ -0,0 +1,304 @@
+"""
+Ensemble Distillation into a Single Student Transformer
+
+The server only consumes the confidence-weighted blend of NN1-NN5, so a
+single compact TransformerPredictor trained to reproduce that blend can
+replace the five-model ensemble on the latency-critical trading path.
+
+Pipeline:
+1. Label windows with the ensemble's blended (return, volatility,
+   confidence) outputs (`ensemble_targets`)
+2. Fit the student to those soft targets with a weighted MSE loss and the
+   student config's learning rate, weight decay and linear warm-up
+3. Report student vs ensemble fidelity and latency (`evaluate_fidelity`)
+
+The server can then serve the student while running the full ensemble as a
+shadow to keep monitoring fidelity on live traffic.
+
+References:
+- Hinton, G., Vinyals, O., & Dean, J. (2015). Distilling the knowledge in a
+  neural network.
+- Buciluǎ, C., Caruana, R., & Niculescu-Mizil, A. (2006). Model compression.
+"""
+
+import time
+import torch
+import torch.nn.functional as F
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import logging
+
+from models.transformer import (
+    TransformerPredictor, TransformerConfig, blend_predictions, create_ensemble
+)
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_KEYS = ('return', 'volatility', 'confidence')
+
+
+def student_config(n_features: int = 94, seq_len: int = 60) -> TransformerConfig:
+    """Default student architecture: NN5-sized, since it must beat one NN on latency."""
+    return TransformerConfig(
+        n_features=n_features,
+        seq_len=seq_len,
+        d_model=64,
+        n_heads=2,
+        n_encoder_layers=2,
+        d_ff=128,
+        dropout=0.05,
+        learning_rate=3e-4,
+        warmup_steps=200,
+    )
+
+
+def create_student(n_features: int = 94, seq_len: int = 60) -> TransformerPredictor:
+    """Create an untrained student model."""
+    return TransformerPredictor(student_config(n_features, seq_len))
+
+
+@dataclass
+class DistillationConfig:
+    """Configuration for ensemble distillation."""
+
+    # Student architecture
+    student: TransformerConfig = field(default_factory=student_config)
+
+    # Optimization
+    epochs: int = 10
+    batch_size: int = 256
+    grad_clip: float = 1.0
+
+    # Loss weights for (return, volatility, confidence)
+    return_weight: float = 1.0
+    volatility_weight: float = 1.0
+    confidence_weight: float = 0.5
+
+    # Validation
+    val_fraction: float = 0.1
+
+
+def ensemble_targets(
+    ensemble: Dict[str, TransformerPredictor],
+    windows: torch.Tensor,
+    batch_size: int = 256
+) -> torch.Tensor:
+    """
+    Label windows with the ensemble's blended outputs.
+
+    Args:
+        ensemble: NN1-NN5 teacher models
+        windows: Input windows (n_windows, seq_len, n_features)
+        batch_size: Inference batch size
+
+    Returns:
+        Tensor (n_windows, 3) of blended (return, volatility, confidence)
+    """
+    for model in ensemble.values():
+        model.eval()
+
+    targets = []
+    with torch.no_grad():
+        for start in range(0, len(windows), batch_size):
+            batch = windows[start:start + batch_size]
+            outputs = [model(batch.to(model.device)) for model in ensemble.values()]
+            outputs = [tuple(t.cpu() for t in output) for output in outputs]
+            targets.append(torch.cat(blend_predictions(outputs), dim=1))
+
+    return torch.cat(targets)
+
+
+class EnsembleDistiller:
+    """
+    Trains a student TransformerPredictor on the ensemble's blended outputs.
+    """
+
+    def __init__(
+        self,
+        ensemble: Dict[str, TransformerPredictor],
+        config: Optional[DistillationConfig] = None,
+        student: Optional[TransformerPredictor] = None
+    ):
+        self.ensemble = ensemble
+        self.config = config or DistillationConfig()
+        self.student = student or TransformerPredictor(self.config.student)
+        self.logger = logging.getLogger(__name__)
+
+    def _loss(self, outputs, targets: torch.Tensor) -> torch.Tensor:
+        pred_return, pred_vol, pred_conf = outputs
+        return (
+            self.config.return_weight * F.mse_loss(pred_return, targets[:, 0:1]) +
+            self.config.volatility_weight * F.mse_loss(pred_vol, targets[:, 1:2]) +
+            self.config.confidence_weight * F.mse_loss(pred_conf, targets[:, 2:3])
+        )
+
+    def fit(self, windows: torch.Tensor) -> Dict[str, List[float]]:
+        """
+        Distill the ensemble into the student.
+
+        Args:
+            windows: Training windows (n_windows, seq_len, n_features)
+
+        Returns:
+            Training history with per-epoch 'train_loss' and 'val_loss'
+        """
+        self.logger.info(f"Labelling {len(windows)} windows with ensemble targets...")
+        targets = ensemble_targets(self.ensemble, windows, self.config.batch_size)
+
+        n_val = int(len(windows) * self.config.val_fraction)
+        perm = torch.randperm(len(windows))
+        val_idx, train_idx = perm[:n_val], perm[n_val:]
+
+        student = self.student
+        device = student.device
+        student_cfg = student.config
+
+        optimizer = torch.optim.AdamW(
+            student.parameters(),
+            lr=student_cfg.learning_rate,
+            weight_decay=student_cfg.weight_decay
+        )
+        warmup = max(student_cfg.warmup_steps, 1)
+        scheduler = torch.optim.lr_scheduler.LambdaLR(
+            optimizer, lambda step: min(1.0, (step + 1) / warmup)
+        )
+
+        history = {'train_loss': [], 'val_loss': []}
+
+        for epoch in range(self.config.epochs):
+            student.train()
+            epoch_perm = train_idx[torch.randperm(len(train_idx))]
+            losses = []
+
+            for start in range(0, len(epoch_perm), self.config.batch_size):
+                idx = epoch_perm[start:start + self.config.batch_size]
+                batch = windows[idx].to(device)
+                batch_targets = targets[idx].to(device)
+
+                loss = self._loss(student(batch), batch_targets)
+
+                optimizer.zero_grad()
+                loss.backward()
+                torch.nn.utils.clip_grad_norm_(student.parameters(), self.config.grad_clip)
+                optimizer.step()
+                scheduler.step()
+
+                losses.append(loss.item())
+
+            history['train_loss'].append(float(np.mean(losses)) if losses else 0.0)
+
+            if n_val > 0:
+                student.eval()
+                with torch.no_grad():
+                    val_loss = self._loss(
+                        student(windows[val_idx].to(device)), targets[val_idx].to(device)
+                    ).item()
+                history['val_loss'].append(val_loss)
+
+            self.logger.info(
+                f"Epoch {epoch + 1}/{self.config.epochs}: "
+                f"train_loss={history['train_loss'][-1]:.6f}"
+                + (f", val_loss={history['val_loss'][-1]:.6f}" if n_val > 0 else "")
+            )
+
+        student.eval()
+        return history
+
+
+def _single_window_latency_ms(fn, window: torch.Tensor, n_runs: int) -> float:
+    fn(window)
+    timings = []
+    for _ in range(n_runs):
+        start = time.perf_counter()
+        fn(window)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def evaluate_fidelity(
+    ensemble: Dict[str, TransformerPredictor],
+    student: TransformerPredictor,
+    windows: torch.Tensor,
+    batch_size: int = 256,
+    n_latency_runs: int = 50
+) -> Dict:
+    """
+    Compare a distilled student against the full ensemble.
+
+    Args:
+        ensemble: NN1-NN5 teacher models
+        student: Distilled student model
+        windows: Held-out windows (n_windows, seq_len, n_features)
+        batch_size: Inference batch size
+        n_latency_runs: Timed single-window runs for each side
+
+    Returns:
+        Dictionary with per-output MAE, RMSE and correlation, return sign
+        agreement, and single-window latency for ensemble and student
+    """
+    targets = ensemble_targets(ensemble, windows, batch_size).numpy()
+
+    student.eval()
+    preds = []
+    with torch.no_grad():
+        for start in range(0, len(windows), batch_size):
+            outputs = student(windows[start:start + batch_size].to(student.device))
+            preds.append(torch.cat(outputs, dim=1).cpu())
+    preds = torch.cat(preds).numpy()
+
+    report = {}
+    for i, key in enumerate(OUTPUT_KEYS):
+        err = preds[:, i] - targets[:, i]
+        correlation = (
+            float(np.corrcoef(preds[:, i], targets[:, i])[0, 1])
+            if len(preds) > 1 and np.std(preds[:, i]) > 0 and np.std(targets[:, i]) > 0
+            else 0.0
+        )
+        report[key] = {
+            'mae': float(np.mean(np.abs(err))),
+            'rmse': float(np.sqrt(np.mean(err ** 2))),
+            'correlation': correlation,
+        }
+
+    report['sign_agreement'] = float(np.mean(np.sign(preds[:, 0]) == np.sign(targets[:, 0])))
+
+    window = windows[:1]
+    ensemble_latency = _single_window_latency_ms(
+        lambda w: [model.predict(w) for model in ensemble.values()], window, n_latency_runs
+    )
+    student_latency = _single_window_latency_ms(student.predict, window, n_latency_runs)
+
+    report['n_windows'] = len(windows)
+    report['ensemble_latency_ms'] = ensemble_latency
+    report['student_latency_ms'] = student_latency
+    report['speedup'] = ensemble_latency / student_latency if student_latency > 0 else 0.0
+
+    return report
+
+
+if __name__ == '__main__':
+    # Distill a randomly initialized ensemble on synthetic windows
+    logging.basicConfig(level=logging.INFO)
+
+    ensemble = create_ensemble(n_features=94, seq_len=60)
+    train_windows = torch.randn(2048, 60, 94)
+    test_windows = torch.randn(256, 60, 94)
+
+    distiller = EnsembleDistiller(ensemble, DistillationConfig(epochs=3))
+    distiller.fit(train_windows)
+
+    report = evaluate_fidelity(ensemble, distiller.student, test_windows)
+
+    print(f"\n{'='*60}")
+    print("Distillation Fidelity Report")
+    print(f"{'='*60}")
+    for key in OUTPUT_KEYS:
+        print(f"{key:<11} MAE={report[key]['mae']:.5f}  RMSE={report[key]['rmse']:.5f}  "
+              f"corr={report[key]['correlation']:.3f}")
+    print(f"Sign agreement:   {report['sign_agreement']:.2%}")
+    print(f"Latency:          {report['ensemble_latency_ms']:.2f}ms (ensemble) -> "
+          f"{report['student_latency_ms']:.2f}ms (student), {report['speedup']:.1f}x")
+
+    print(f"\n{'='*60}")
+    print("✅ Distillation test complete!")
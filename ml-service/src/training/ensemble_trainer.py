@@ -0,0 +1,303 @@
+"""
+Parallel Training of the NN1-NN5 Ensemble
+
+The five ensemble members share nothing but their training data, so they
+are trained concurrently, one spawned process per member:
+
+- Each process gets a fixed intra-op thread budget and, where the OS
+  allows, a disjoint set of CPU cores, so members do not oversubscribe
+  the machine or migrate between cores
+- All processes open the same memory-mapped FeatureStore read-only; the
+  page cache holds a single copy of the data
+- Each member checkpoints after every epoch to {output_dir}/{name}.ckpt;
+  rerunning after an interruption resumes every member from its last
+  epoch and skips members that already finished (their weights file is
+  written and their checkpoint has reached the configured epochs)
+- Training uses bf16 autocast on CPUs with native bf16 support
+- Finished members are written as {output_dir}/{name}.safetensors, ready
+  to be deployed to the server's MODEL_PATH
+
+Usage:
+    python -m training.ensemble_trainer <feature_store> <output_dir> [--epochs 10]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+import logging
+
+from training.trainer import TrainingConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EnsembleTrainingConfig:
+    """Configuration for parallel ensemble training."""
+
+    store_path: str
+    output_dir: str
+
+    # Members to train (default: all of ensemble_configs)
+    members: Optional[Sequence[str]] = None
+
+    # Data
+    seq_len: int = 60
+    n_features: int = 94
+    horizon: int = 1
+    stride: int = 1
+    val_fraction: float = 0.1
+    batch_size: int = 256
+    shuffle_buffer: int = 8192
+
+    # Parallelism: members trained at once, intra-op threads per member
+    # (default: cores split evenly), DataLoader workers per member
+    max_parallel: Optional[int] = None
+    threads_per_member: Optional[int] = None
+    loader_workers: int = 1
+    pin_cores: bool = True
+
+    # Per-member training loop (epochs, loss weights, precision)
+    training: TrainingConfig = field(default_factory=TrainingConfig)
+
+
+def _available_cores() -> List[int]:
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_core_budgets(n_members: int, threads_per_member: Optional[int] = None) -> List[List[int]]:
+    """
+    Split the available cores into one disjoint set per member.
+
+    With more members than cores, sets wrap around and members share cores.
+
+    Args:
+        n_members: Number of members trained concurrently
+        threads_per_member: Cores per member (default: even split, at least 1)
+
+    Returns:
+        List of core id lists, one per member
+    """
+    cores = _available_cores()
+    per_member = threads_per_member or max(1, len(cores) // max(n_members, 1))
+    return [
+        [cores[(i * per_member + j) % len(cores)] for j in range(per_member)]
+        for i in range(n_members)
+    ]
+
+
+def _train_member(name: str, config: EnsembleTrainingConfig, cores: List[int], results):
+    """Process entry point: train one member with a pinned thread budget."""
+    import torch
+
+    torch.set_num_threads(len(cores))
+    torch.set_num_interop_threads(1)
+    if config.pin_cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - {name} - %(levelname)s - %(message)s'
+    )
+
+    from models.transformer import TransformerPredictor, ensemble_configs
+    from models.weights import save_weights
+    from training.dataset import FeatureStore, WindowDataset, create_loader
+    from training.trainer import TransformerTrainer
+
+    start = time.perf_counter()
+    try:
+        model_config = ensemble_configs(config.n_features, config.seq_len)[name]
+        model = TransformerPredictor(model_config)
+        trainer = TransformerTrainer(model, config.training)
+
+        n_bars = FeatureStore(config.store_path).n_bars
+        split = int(n_bars * (1 - config.val_fraction))
+        train_set = WindowDataset(
+            config.store_path, config.seq_len, config.horizon,
+            bar_range=(0, split), stride=config.stride,
+            shuffle_buffer=config.shuffle_buffer, seed=zlib.crc32(name.encode())
+        )
+        val_loader = None
+        if split < n_bars:
+            val_set = WindowDataset(
+                config.store_path, config.seq_len, config.horizon,
+                bar_range=(split, n_bars), stride=config.stride, shuffle=False
+            )
+            val_loader = create_loader(val_set, config.batch_size, num_workers=0)
+
+        logger.info(
+            f"Training on {len(cores)} threads (cores {cores}), "
+            f"autocast={trainer.autocast_dtype or 'fp32'}"
+        )
+        history = trainer.fit(
+            create_loader(train_set, config.batch_size, num_workers=config.loader_workers),
+            val_loader,
+            checkpoint_path=os.path.join(config.output_dir, f'{name}.ckpt')
+        )
+        save_weights(model, os.path.join(config.output_dir, f'{name}.safetensors'))
+
+        results.put((name, {
+            'history': history,
+            'seconds': time.perf_counter() - start,
+            'autocast': str(trainer.autocast_dtype or 'fp32'),
+        }))
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Training {name} failed: {e}", exc_info=True)
+        results.put((name, {'error': str(e), 'seconds': time.perf_counter() - start}))
+
+
+def _finished_history(name: str, config: EnsembleTrainingConfig) -> Optional[Dict]:
+    """Training history of a member that already finished, or None."""
+    import torch
+
+    weights_path = os.path.join(config.output_dir, f'{name}.safetensors')
+    checkpoint_path = os.path.join(config.output_dir, f'{name}.ckpt')
+    if not (os.path.exists(weights_path) and os.path.exists(checkpoint_path)):
+        return None
+    state = torch.load(checkpoint_path, map_location='cpu')
+    if state['epoch'] < config.training.epochs:
+        return None
+    return state['history']
+
+
+def train_ensemble(config: EnsembleTrainingConfig) -> Dict[str, Dict]:
+    """
+    Train ensemble members concurrently in spawned processes.
+
+    Args:
+        config: Ensemble training configuration
+
+    Returns:
+        Per-member result with 'history', 'seconds' and 'autocast' (or
+        'skipped' for members that had already finished), or 'error' if
+        the member failed
+    """
+    from models.transformer import ensemble_configs
+
+    os.makedirs(config.output_dir, exist_ok=True)
+    members = list(config.members or ensemble_configs(config.n_features, config.seq_len))
+    outcomes: Dict[str, Dict] = {}
+    pending = []
+    for name in members:
+        history = _finished_history(name, config)
+        if history is None:
+            pending.append(name)
+        else:
+            outcomes[name] = {'history': history, 'seconds': 0.0, 'skipped': True}
+            logger.info(f"Skipping {name}: already trained for {config.training.epochs} epochs")
+
+    max_parallel = config.max_parallel or len(pending)
+    budgets = plan_core_budgets(min(max_parallel, len(pending)), config.threads_per_member)
+
+    # spawn: fresh interpreters, no forked torch thread pools or locks
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    running: Dict[str, mp.Process] = {}
+    free_budgets = list(range(len(budgets)))
+    slots: Dict[str, int] = {}
+
+    while pending or running:
+        while pending and free_budgets:
+            name = pending.pop(0)
+            slot = free_budgets.pop(0)
+            process = ctx.Process(
+                target=_train_member, args=(name, config, budgets[slot], results),
+                name=f'train-{name}'
+            )
+            process.start()
+            running[name] = process
+            slots[name] = slot
+            logger.info(f"Started {name} (pid {process.pid}) on cores {budgets[slot]}")
+
+        try:
+            name, outcome = results.get(timeout=5)
+        except queue.Empty:
+            # A member that exited without reporting (killed, or a clean exit
+            # that never put a result) is failed. Drain the queue once more
+            # first: a result put just before exit may have raced the timeout.
+            exited = [n for n, p in running.items() if p.exitcode is not None]
+            if not exited:
+                continue
+            try:
+                name, outcome = results.get(timeout=1)
+            except queue.Empty:
+                name = exited[0]
+                outcome = {'error': f"exited with code {running[name].exitcode} without a result",
+                           'seconds': 0.0}
+        outcomes[name] = outcome
+        running.pop(name).join()
+        free_budgets.append(slots.pop(name))
+        logger.info(f"{name} finished in {outcome['seconds']:.1f}s"
+                    + (f" with error: {outcome['error']}" if 'error' in outcome else ""))
+
+    return outcomes
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train NN1-NN5 in parallel")
+    parser.add_argument('store_path', help="FeatureStore directory (training/dataset.py)")
+    parser.add_argument('output_dir', help="Checkpoint and weights directory")
+    parser.add_argument('--members', nargs='*', default=None)
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--horizon', type=int, default=1)
+    parser.add_argument('--stride', type=int, default=1)
+    parser.add_argument('--max-steps-per-epoch', type=int, default=None)
+    parser.add_argument('--max-parallel', type=int, default=None)
+    parser.add_argument('--threads-per-member', type=int, default=None)
+    parser.add_argument('--precision', choices=('auto', 'bf16', 'fp32'), default='auto')
+    args = parser.parse_args(argv)
+
+    config = EnsembleTrainingConfig(
+        store_path=args.store_path,
+        output_dir=args.output_dir,
+        members=args.members,
+        horizon=args.horizon,
+        stride=args.stride,
+        batch_size=args.batch_size,
+        max_parallel=args.max_parallel,
+        threads_per_member=args.threads_per_member,
+        training=TrainingConfig(
+            epochs=args.epochs,
+            max_steps_per_epoch=args.max_steps_per_epoch,
+            precision=args.precision,
+        ),
+    )
+
+    start = time.perf_counter()
+    outcomes = train_ensemble(config)
+
+    print(f"\n{'='*60}")
+    print(f"Ensemble Training Report ({time.perf_counter() - start:.1f}s wall)")
+    print(f"{'='*60}")
+    for name, outcome in sorted(outcomes.items()):
+        if 'error' in outcome:
+            print(f"{name}: ❌ {outcome['error']}")
+            continue
+        history = outcome['history']
+        val = f", val_loss={history['val_loss'][-1]:.6f}" if history['val_loss'] else ""
+        timing = "already trained" if outcome.get('skipped') else f"{outcome['seconds']:.1f}s ({outcome['autocast']})"
+        print(f"{name}: train_loss={history['train_loss'][-1]:.6f}{val}  {timing}")
+
+    failed = [name for name, outcome in outcomes.items() if 'error' in outcome]
+    if failed:
+        return 1
+
+    print(f"\n{'='*60}")
+    print("✅ Ensemble training complete!")
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
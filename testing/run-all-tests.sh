@@ -75,6 +75,14 @@ run_test "Jest Sanity Tests" \
 run_test "Type Definitions" \
     "cd /home/ubuntu/noderr-node-os/packages/types && pnpm build > /dev/null 2>&1"
 
+# Test: ML service startup-time budget
+if python3 -c "import torch, grpc" > /dev/null 2>&1; then
+    run_test "ML Service Startup Budget" \
+        "cd /home/ubuntu/noderr-node-os/ml-service/src && python3 -m lazy_imports --budget-ms 4000 > /dev/null 2>&1"
+else
+    skip_test "ML Service Startup Budget" "ML service dependencies not installed"
+fi
+
 echo "========================================="
 echo "3. SMART CONTRACT TESTS"
 echo "========================================="